@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import math
+import os
+import shutil
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+import orjson
+
+
+_ARRAY_NAMES = ("idf", "doc_len", "indptr", "doc_ids", "term_freqs")
+# Recorded in the saved header; an index built with another tokenizer is rejected on load
+TOKENIZER = "lower-whitespace"
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase + whitespace split. Shared by index builds and queries so they always agree."""
+    return text.lower().split()
+
+
+class CompactBM25:
+    """
+    BM25Okapi scoring (same formula and idf floor as rank_bm25) over an
+    inverted index kept in flat NumPy arrays. Postings are stored per term
+    (CSR: indptr/doc_ids/term_freqs), so a query only touches documents that
+    contain its terms, and the saved arrays can be memory-mapped on load.
+    """
+
+    def __init__(
+        self,
+        *,
+        vocab: Dict[str, int],
+        idf: np.ndarray,
+        doc_len: np.ndarray,
+        indptr: np.ndarray,
+        doc_ids: np.ndarray,
+        term_freqs: np.ndarray,
+        avgdl: float,
+        k1: float = 1.5,
+        b: float = 0.75,
+    ) -> None:
+        self._vocab = vocab
+        self._idf = idf
+        self._doc_len = doc_len
+        self._indptr = indptr
+        self._doc_ids = doc_ids
+        self._term_freqs = term_freqs
+        self.corpus_size = len(doc_len)
+        self.avgdl = avgdl
+        self.k1 = k1
+        self.b = b
+        # Length normalization is per document, not per query term
+        self._doc_norm = k1 * (1 - b + b * np.asarray(doc_len) / avgdl)
+
+    @classmethod
+    def from_corpus(
+        cls,
+        tokenized_corpus: Iterable[Sequence[str]],
+        k1: float = 1.5,
+        b: float = 0.75,
+        epsilon: float = 0.25,
+    ) -> "CompactBM25":
+        vocab: Dict[str, int] = {}
+        doc_len = array("i")
+        term_ids = array("i")
+        posting_docs = array("i")
+        posting_freqs = array("i")
+        for doc_id, document in enumerate(tokenized_corpus):
+            doc_len.append(len(document))
+            for word, freq in Counter(document).items():
+                term_id = vocab.get(word)
+                if term_id is None:
+                    term_id = vocab[word] = len(vocab)
+                term_ids.append(term_id)
+                posting_docs.append(doc_id)
+                posting_freqs.append(freq)
+
+        corpus_size = len(doc_len)
+        avgdl = sum(doc_len) / corpus_size
+
+        # Group postings by term; stable so each term's docs stay in corpus order
+        term_ids_np = np.frombuffer(term_ids, dtype=np.int32)
+        order = np.argsort(term_ids_np, kind="stable")
+        doc_freq = np.bincount(term_ids_np, minlength=len(vocab))
+        indptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(doc_freq, out=indptr[1:])
+
+        # Same idf and epsilon floor as rank_bm25's BM25Okapi, summed in the
+        # same order so scores match it exactly
+        idf = [math.log(corpus_size - freq + 0.5) - math.log(freq + 0.5) for freq in doc_freq.tolist()]
+        idf_sum = 0.0
+        for value in idf:
+            idf_sum += value
+        eps = epsilon * (idf_sum / len(idf))
+        idf_np = np.array(idf, dtype=np.float64)
+        idf_np[idf_np < 0] = eps
+
+        return cls(
+            vocab=vocab,
+            idf=idf_np,
+            doc_len=np.frombuffer(doc_len, dtype=np.int32).copy(),
+            indptr=indptr,
+            doc_ids=np.frombuffer(posting_docs, dtype=np.int32)[order],
+            term_freqs=np.frombuffer(posting_freqs, dtype=np.int32)[order],
+            avgdl=avgdl,
+            k1=k1,
+            b=b,
+        )
+
+    def get_scores(self, query: Iterable[str]) -> np.ndarray:
+        """Score every document against the query tokens, like BM25Okapi.get_scores."""
+        score = np.zeros(self.corpus_size)
+        for token in query:
+            term_id = self._vocab.get(token)
+            if term_id is None:
+                continue  # Unknown terms contribute nothing
+            start, end = self._indptr[term_id], self._indptr[term_id + 1]
+            docs = self._doc_ids[start:end]
+            freqs = self._term_freqs[start:end]
+            score[docs] += self._idf[term_id] * (freqs * (self.k1 + 1) / (freqs + self._doc_norm[docs]))
+        return score
+
+    def save(self, directory: Path, chunk_ids: List[str]) -> None:
+        """
+        Write arrays as .npy plus a JSON header (vocab, chunk IDs, params).
+        Files go to a temp directory that replaces the old one once complete.
+        """
+        tmp_dir = directory.with_name(directory.name + ".tmp")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+        for name in _ARRAY_NAMES:
+            np.save(tmp_dir / f"{name}.npy", getattr(self, f"_{name}"))
+        header = {
+            "k1": self.k1,
+            "b": self.b,
+            "avgdl": self.avgdl,
+            "tokenizer": TOKENIZER,
+            "vocab": list(self._vocab),  # Insertion order is term ID order
+            "chunk_ids": chunk_ids,
+        }
+        (tmp_dir / "header.json").write_bytes(orjson.dumps(header))
+
+        old_dir = directory.with_name(directory.name + ".old")
+        if directory.exists():
+            shutil.rmtree(old_dir, ignore_errors=True)
+            os.replace(directory, old_dir)
+        os.replace(tmp_dir, directory)
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+    @classmethod
+    def load(cls, directory: Path) -> Tuple["CompactBM25", List[str]]:
+        """Load a saved index with its arrays memory-mapped. Returns (index, chunk_ids)."""
+        header = orjson.loads((directory / "header.json").read_bytes())
+        tokenizer = header.get("tokenizer", TOKENIZER)
+        if tokenizer != TOKENIZER:
+            raise ValueError(f"BM25 index was built with tokenizer {tokenizer!r}, expected {TOKENIZER!r}; rebuild it")
+        arrays = {name: np.load(directory / f"{name}.npy", mmap_mode="r") for name in _ARRAY_NAMES}
+        index = cls(
+            vocab={term: term_id for term_id, term in enumerate(header["vocab"])},
+            avgdl=header["avgdl"],
+            k1=header["k1"],
+            b=header["b"],
+            **arrays,
+        )
+        return index, header["chunk_ids"]
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
-import json
-from pathlib import Path
-from typing import Iterable, List
+import asyncio
+from functools import lru_cache
+from typing import AsyncIterator, Iterable, List, Optional
 
-from openai import OpenAI
+import orjson
+import tiktoken
 
 from .config import Settings
+from .openai_client import get_async_client
 from .retrieval import RetrievedChunk
 
 
@@ -26,88 +28,197 @@ SYSTEM_PROMPT = """You are an email research assistant helping the user understa
 - Use headers to organize longer answers
 - Keep responses clear and concise"""
 
+# Static prompt text is kept byte-identical across requests so OpenAI's
+# automatic prompt caching can reuse the processed prefix
+_USER_INSTRUCTIONS = """Answer the question using the email context below. Make reasonable inferences from the available information.
+
+For questions like "who is X?":
+- If emails mention X in a clear role/context, describe what you can infer
+- Don't hedge with "I cannot find specific information" if you have relevant details
+- Be direct and confident when the context clearly indicates who someone is
+
+Only say you cannot find information if the context is truly unrelated or empty."""
+
+_USER_PROMPT_PREFIX = _USER_INSTRUCTIONS + "\n\nContext:\n"
+
+# History sent with each question: at least the last HISTORY_WINDOW_MESSAGES,
+# extended back to a HISTORY_BLOCK_MESSAGES boundary. The server compacts
+# stored history by the same block, so the window's start only moves every 3
+# exchanges and the prompt prefix repeats in between (OpenAI prompt cache hits)
+HISTORY_WINDOW_MESSAGES = 10
+HISTORY_BLOCK_MESSAGES = 6
+
+
+@lru_cache(maxsize=4)
+def _get_encoding(model: str) -> tiktoken.Encoding:
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
 
 class ChatService:
     def __init__(self, settings: Settings) -> None:
         self._settings = settings
-        self._client = OpenAI(api_key=settings.openai_api_key)
+        self._client = get_async_client(settings)
+        # Throttle in-flight completions so bursts don't trip rate limits
+        self._semaphore = asyncio.Semaphore(settings.chat_max_concurrent)
         self._logs_path = settings.logs_dir / "interactions.jsonl"
         self._logs_path.parent.mkdir(parents=True, exist_ok=True)
+        # Interaction log is written by a background task that batches lines
+        # through one long-lived handle, keeping file I/O off the answer path
+        self._log_fh = self._logs_path.open("ab", buffering=1 << 16)
+        self._log_queue: Optional[asyncio.Queue] = None
+        self._log_task: Optional[asyncio.Task] = None
 
-    def answer(self, question: str, context_chunks: List[RetrievedChunk], conversation_history: List[dict] = None) -> dict:
+    async def answer(self, question: str, context_chunks: List[RetrievedChunk], conversation_history: List[dict] = None) -> dict:
         context_blocks = self._format_context(context_chunks)
         if not context_blocks:
             return {"answer": "No relevant emails were found.", "citations": []}
         
+        messages = self._build_messages(question, context_blocks, conversation_history)
+        async with self._semaphore:
+            response = await self._client.chat.completions.create(
+                model=self._settings.chat_model,
+                messages=messages,
+                temperature=0.2,
+                max_tokens=600,
+            )
+        answer_text = response.choices[0].message.content.strip()
+        payload = {
+            "answer": answer_text,
+            "citations": self._build_citations(context_chunks[:len(context_blocks)]),
+        }
+        await self._log_interaction(question=question, payload=payload, context=context_blocks)
+        return payload
+
+    async def answer_stream(
+        self,
+        question: str,
+        context_chunks: List[RetrievedChunk],
+        conversation_history: List[dict] = None,
+    ) -> AsyncIterator[dict]:
+        """
+        Stream an answer as events: one {"type": "citations"} event first,
+        then {"type": "delta", "content": ...} events as tokens arrive.
+        """
+        context_blocks = self._format_context(context_chunks)
+        citations = self._build_citations(context_chunks[:len(context_blocks)])
+        yield {"type": "citations", "citations": citations}
+        if not context_blocks:
+            yield {"type": "delta", "content": "No relevant emails were found."}
+            return
+        
+        messages = self._build_messages(question, context_blocks, conversation_history)
+        parts: List[str] = []
+        async with self._semaphore:
+            stream = await self._client.chat.completions.create(
+                model=self._settings.chat_model,
+                messages=messages,
+                temperature=0.2,
+                max_tokens=600,
+                stream=True,
+            )
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    yield {"type": "delta", "content": delta}
+        payload = {
+            "answer": "".join(parts).strip(),
+            "citations": citations,
+        }
+        await self._log_interaction(question=question, payload=payload, context=context_blocks)
+
+    def _build_messages(self, question: str, context_blocks: List[str], conversation_history: Optional[List[dict]]) -> List[dict]:
         # Build messages with conversation history
         messages = [{"role": "system", "content": SYSTEM_PROMPT}]
         
-        # Add recent conversation history (last 10 messages = 5 exchanges)
+        # Add recent conversation history (10-15 messages once it is long enough)
         if conversation_history:
-            recent = conversation_history[-10:] if len(conversation_history) > 10 else conversation_history
-            messages.extend(recent)
+            overflow = max(len(conversation_history) - HISTORY_WINDOW_MESSAGES, 0)
+            start = overflow // HISTORY_BLOCK_MESSAGES * HISTORY_BLOCK_MESSAGES  # Round down to a block
+            messages.extend(conversation_history[start:])
         
         # Add current question with email context
         messages.append({
             "role": "user",
             "content": self._build_user_prompt(question, context_blocks),
         })
-        
-        response = self._client.chat.completions.create(
-            model=self._settings.chat_model,
-            messages=messages,
-            temperature=0.2,
-            max_tokens=600,
-        )
-        answer_text = response.choices[0].message.content.strip()
-        payload = {
-            "answer": answer_text,
-            "citations": self._build_citations(context_chunks),
-        }
-        self._log_interaction(question=question, payload=payload, context=context_blocks)
-        return payload
+        return messages
 
     def _format_context(self, chunks: Iterable[RetrievedChunk]) -> List[str]:
+        """
+        Format chunks as numbered context blocks. Snippets are capped at
+        max_snippet_chars, and blocks stop once max_context_tokens is spent.
+        """
+        max_chars = self._settings.max_snippet_chars
+        budget = self._settings.max_context_tokens
+        encoding = _get_encoding(self._settings.chat_model)
         blocks: List[str] = []
         for idx, item in enumerate(chunks, start=1):
             chunk = item.chunk
-            header = f"[{idx}] Subject: {chunk.subject} | Date: {chunk.date} | From: {chunk.from_address}"
-            block = f"{header}\nSnippet:\n{chunk.snippet.strip()}"
+            snippet = chunk.snippet.strip()
+            if len(snippet) > max_chars:
+                snippet = snippet[:max_chars].rstrip() + "…"
+            block = f"[{idx}] Subject: {chunk.subject} | Date: {chunk.date} | From: {chunk.from_address}\nSnippet:\n{snippet}"
+            budget -= len(encoding.encode_ordinary(block))
+            if budget < 0 and blocks:
+                break
             blocks.append(block)
         return blocks
 
     def _build_user_prompt(self, question: str, context_blocks: List[str]) -> str:
         context_text = "\n\n".join(context_blocks)
-        instructions = """Answer the question using the email context below. Make reasonable inferences from the available information.
-
-For questions like "who is X?":
-- If emails mention X in a clear role/context, describe what you can infer
-- Don't hedge with "I cannot find specific information" if you have relevant details
-- Be direct and confident when the context clearly indicates who someone is
-
-Only say you cannot find information if the context is truly unrelated or empty."""
-        return f"{instructions}\n\nContext:\n{context_text}\n\nQuestion: {question}\nAnswer:"
+        return "".join([_USER_PROMPT_PREFIX, context_text, "\n\nQuestion: ", question, "\nAnswer:"])
 
     def _build_citations(self, chunks: List[RetrievedChunk]) -> List[dict]:
-        citations: List[dict] = []
-        for idx, item in enumerate(chunks, start=1):
-            chunk = item.chunk
-            citations.append(
-                {
-                    "label": f"[{idx}] {chunk.subject}",
-                    "date": chunk.date,
-                    "from": chunk.from_address,
-                    "message_id": chunk.message_id,
-                    "score": round(item.score, 3),
-                }
-            )
-        return citations
-
-    def _log_interaction(self, *, question: str, payload: dict, context: List[str]) -> None:
+        return [
+            {
+                "label": f"[{idx}] {item.chunk.subject}",
+                "date": item.chunk.date,
+                "from": item.chunk.from_address,
+                "message_id": item.chunk.message_id,
+                "score": round(item.score, 3),
+            }
+            for idx, item in enumerate(chunks, start=1)
+        ]
+
+    async def _log_interaction(self, *, question: str, payload: dict, context: List[str]) -> None:
         record = {
             "question": question,
             "response": payload,
             "context": context,
         }
-        with self._logs_path.open("a", encoding="utf-8") as handle:
-            handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+        if self._log_task is None:
+            self._log_queue = asyncio.Queue()
+            self._log_task = asyncio.create_task(self._drain_log_queue())
+        self._log_queue.put_nowait(orjson.dumps(record) + b"\n")
+
+    async def _drain_log_queue(self, max_batch: int = 64) -> None:
+        """Write queued log lines in batches with a single write + flush each."""
+        while True:
+            lines = [await self._log_queue.get()]
+            while len(lines) < max_batch and not self._log_queue.empty():
+                lines.append(self._log_queue.get_nowait())
+            try:
+                await asyncio.to_thread(self._write_log_lines, lines)
+            except Exception as e:
+                print(f"⚠️  Failed to write interaction log: {e}")
+            finally:
+                for _ in lines:
+                    self._log_queue.task_done()
+
+    def _write_log_lines(self, lines: List[bytes]) -> None:
+        self._log_fh.write(b"".join(lines))
+        self._log_fh.flush()
+
+    async def aclose(self) -> None:
+        """Flush pending interaction log lines and close the log handle."""
+        if self._log_task is not None:
+            await self._log_queue.join()
+            self._log_task.cancel()
+            self._log_task = None
+        self._log_fh.close()
@@ -1,12 +1,29 @@
 from __future__ import annotations
 
+from functools import lru_cache
+
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+# Tokenizer used by the text-embedding-3 models
+EMBEDDING_ENCODING = "cl100k_base"
 
-def make_chunks(text: str, chunk_size: int, chunk_overlap: int) -> list[str]:
-    splitter = RecursiveCharacterTextSplitter(
+
+@lru_cache(maxsize=8)
+def _get_splitter(chunk_size: int, chunk_overlap: int) -> RecursiveCharacterTextSplitter:
+    return RecursiveCharacterTextSplitter.from_tiktoken_encoder(
+        encoding_name=EMBEDDING_ENCODING,
         chunk_size=chunk_size,
         chunk_overlap=chunk_overlap,
         separators=["\n\n", "\n", " ", ""],
     )
+
+
+def make_chunks(text: str, chunk_size: int, chunk_overlap: int) -> list[str]:
+    """Split text into chunks of at most chunk_size tokens, overlapping by chunk_overlap tokens."""
+    # A token is at least one UTF-8 byte, so short emails fit in one chunk
+    # and can skip tokenization entirely
+    stripped = text.strip()
+    if len(stripped.encode("utf-8")) <= chunk_size:
+        return [stripped] if stripped else []
+    splitter = _get_splitter(chunk_size, chunk_overlap)
     return [chunk for chunk in splitter.split_text(text) if chunk.strip()]
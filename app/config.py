@@ -1,5 +1,6 @@
 import os
 from dataclasses import dataclass
+from functools import cached_property, lru_cache
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -18,12 +19,27 @@ class Settings:
     regression_cases_path: Path
     openai_api_key: str
     embedding_model: str = "text-embedding-3-large"
+    embedding_max_concurrent: int = 16  # Cap on in-flight embedding batches
+    embedding_cache_size: int = 20000  # Chunk embeddings kept across ingestion runs (~6 KB each as float16)
     chat_model: str = "gpt-4o"
+    chat_max_concurrent: int = 64  # Cap on in-flight chat completions per process
     chunk_size_tokens: int = 500
     chunk_overlap_tokens: int = 50
+    ingest_batch_chunks: int = 100  # Chunks per embedding request during ingestion
+    ingest_max_inflight_batches: int = 3  # Embedding batches overlapped with chunking
+    checkpoint_every_batches: int = 10  # Save the ingestion checkpoint after this many batches...
+    checkpoint_every_seconds: float = 30.0  # ...or after this long, whichever comes first
     chroma_collection: str = "emails"
     top_k: int = 100  # Retrieve many chunks to ensure keyword matches are included
     top_k_final: int = 10  # Final number after thread deduplication (increased from 6)
+    expansion_skip_max_words: int = 4  # Specific queries (date/name) this short skip LLM expansion
+    expansion_timeout_seconds: float = 1.5  # Expansions slower than this are dropped for the plain-query results
+    max_snippet_chars: int = 1500  # Per-chunk cap when building the chat prompt
+    max_context_tokens: int = 6000  # Stop adding context blocks past this many tokens
+    response_cache_size: int = 500  # Recent answers reused for a repeated question
+    response_cache_ttl_seconds: float = 3600.0  # ...until they are this old
+    semantic_cache_size: int = 1000  # Recent standalone questions matched by embedding similarity
+    semantic_cache_threshold: float = 0.92  # Cosine similarity at which a paraphrase reuses the answer
     ssl_certfile: Path | None = None
     ssl_keyfile: Path | None = None
     
@@ -49,7 +65,18 @@ class Settings:
         'alerts@',
     )
 
+    @cached_property
+    def spam_subject_needles(self) -> tuple:
+        """Spam subject patterns lowercased once, for matching lowercased subjects."""
+        return tuple(p.lower() for p in self.spam_subject_patterns)
 
+    @cached_property
+    def spam_sender_needles(self) -> tuple:
+        """Spam sender patterns lowercased once, for matching lowercased senders."""
+        return tuple(p.lower() for p in self.spam_sender_patterns)
+
+
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     load_dotenv()
     root = Path(__file__).resolve().parent.parent
@@ -1,23 +1,31 @@
 from __future__ import annotations
 
-import json
+import base64
+import quopri
 import uuid
-from dataclasses import asdict, dataclass
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email import policy
+from email.parser import BytesHeaderParser
+from email.utils import getaddresses, parsedate_to_datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Optional
 
 import mailparser
-import pendulum
+import orjson
 
+_HEADER_PARSER = BytesHeaderParser(policy=policy.default)
 
-@dataclass
+
+@dataclass(slots=True)
 class AttachmentMeta:
     filename: Optional[str]
     content_type: Optional[str]
     size: Optional[int]
 
 
-@dataclass
+@dataclass(slots=True)
 class ParsedEmail:
     message_id: str
     thread_id: str
@@ -31,10 +39,9 @@ class ParsedEmail:
     attachments: List[AttachmentMeta]
     raw_path: Path
 
-    def to_json(self) -> str:
-        payload = asdict(self)
-        payload["raw_path"] = str(self.raw_path)
-        return json.dumps(payload, ensure_ascii=False, indent=2)
+    def to_json(self) -> bytes:
+        # orjson walks the dataclass natively; default= only sees raw_path
+        return orjson.dumps(self, default=str, option=orjson.OPT_INDENT_2)
 
 
 def _safe_message_id(candidate: Optional[str]) -> str:
@@ -43,8 +50,118 @@ def _safe_message_id(candidate: Optional[str]) -> str:
     return f"generated-{uuid.uuid4()}"
 
 
+def _to_utc_string(dt: datetime) -> str:
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)  # mailparser returns naive UTC datetimes
+    return dt.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+@lru_cache(maxsize=65536)
+def _parse_date_string(text: str) -> Optional[str]:
+    # Mailing lists and bulk senders repeat exact Date headers, so cache by string
+    try:
+        return _to_utc_string(parsedate_to_datetime(text))
+    except (TypeError, ValueError):
+        try:
+            return _to_utc_string(datetime.fromisoformat(text))
+        except ValueError:
+            return None
+
+
+def to_iso8601_utc(value: datetime | str | None) -> str:
+    """
+    Normalize an email date (datetime, RFC 2822 or ISO 8601 string) to an
+    ISO 8601 UTC string like 2024-05-01T17:03:00Z. Missing or unparseable
+    dates fall back to the current time.
+    """
+    if isinstance(value, datetime):
+        return _to_utc_string(value)
+    parsed = _parse_date_string(str(value).strip()) if value else None
+    return parsed or _to_utc_string(datetime.now(timezone.utc))
+
+
+def _split_headers_body(raw: bytes) -> tuple[bytes, bytes]:
+    crlf = raw.find(b"\r\n\r\n")
+    lf = raw.find(b"\n\n")
+    if crlf != -1 and (lf == -1 or crlf < lf):
+        return raw[:crlf + 2], raw[crlf + 4:]
+    if lf != -1:
+        return raw[:lf + 1], raw[lf + 2:]
+    return raw, b""
+
+
+def _header_addresses(headers, name: str) -> List[str]:
+    values = [str(value) for value in headers.get_all(name, [])]
+    return [addr for _, addr in getaddresses(values) if addr]
+
+
+def parse_sender_and_subject(raw: bytes) -> tuple[str, str]:
+    """
+    Read only the header block of a raw message and return (from_address,
+    subject) as parse_email_file would, without decoding any MIME parts.
+    """
+    header_bytes, _ = _split_headers_body(raw)
+    headers = _HEADER_PARSER.parsebytes(header_bytes)
+    from_addresses = _header_addresses(headers, "From")
+    return (
+        from_addresses[0] if from_addresses else "unknown",
+        str(headers.get("Subject", "")) or "(no subject)",
+    )
+
+
+def _parse_plain_text_email(raw: bytes, path: Path) -> Optional[ParsedEmail]:
+    """
+    Fast path for single-part text/plain messages: parse only the headers
+    and decode the body directly. Returns None for anything else (multipart,
+    HTML, unknown encodings) so the caller can fall back to mailparser.
+    """
+    header_bytes, body_bytes = _split_headers_body(raw)
+    headers = _HEADER_PARSER.parsebytes(header_bytes)
+    if headers.get_content_type() != "text/plain":
+        return None
+
+    encoding = str(headers.get("Content-Transfer-Encoding", "")).strip().lower()
+    if encoding == "quoted-printable":
+        body_bytes = quopri.decodestring(body_bytes)
+    elif encoding == "base64":
+        try:
+            body_bytes = base64.b64decode(body_bytes)
+        except ValueError:
+            return None
+    elif encoding not in ("", "7bit", "8bit", "binary"):
+        return None
+    charset = headers.get_content_charset() or "utf-8"
+    try:
+        body_text = body_bytes.decode(charset, errors="replace")
+    except LookupError:
+        body_text = body_bytes.decode("utf-8", errors="replace")
+    if not body_text.strip():
+        body_text = raw.decode("utf-8", errors="replace")
+
+    message_id = _safe_message_id(str(headers.get("Message-ID", "")) or path.stem)
+    from_addresses = _header_addresses(headers, "From")
+    labels = str(headers.get("X-Gmail-Labels", "")).split(",")
+    return ParsedEmail(
+        message_id=message_id,
+        thread_id=str(headers.get("Thread-Index", "")) or message_id,
+        subject=str(headers.get("Subject", "")) or "(no subject)",
+        from_address=from_addresses[0] if from_addresses else "unknown",
+        to=_header_addresses(headers, "To"),
+        cc=_header_addresses(headers, "Cc"),
+        date=to_iso8601_utc(str(headers.get("Date", ""))),
+        body_text=body_text,
+        labels=[label.strip() for label in labels if label.strip()],
+        attachments=[],
+        raw_path=path,
+    )
+
+
 def parse_email_file(path: Path) -> ParsedEmail:
-    parsed = mailparser.parse_from_file(str(path))
+    raw = path.read_bytes()
+    fast = _parse_plain_text_email(raw, path)
+    if fast is not None:
+        return fast
+    parsed = mailparser.parse_from_bytes(raw)
     message_id = _safe_message_id(parsed.message_id or path.stem)
     thread_id = parsed.headers.get("Thread-Index") or message_id
     subject = parsed.subject or "(no subject)"
@@ -58,15 +175,11 @@ def parse_email_file(path: Path) -> ParsedEmail:
     to = [addr for addr in to if addr]
     cc = [addr for _, addr in parsed.cc] if parsed.cc else []
     cc = [addr for addr in cc if addr]
-    date_str = parsed.date if isinstance(parsed.date, str) else parsed.date.isoformat() if parsed.date else None
-    if not date_str:
-        date_str = pendulum.now("UTC").to_iso8601_string()
-    else:
-        date_str = pendulum.parse(str(date_str)).to_iso8601_string()
+    date_str = to_iso8601_utc(parsed.date)
     body_text = parsed.text_plain[0] if parsed.text_plain else parsed.body
     body_text = body_text or ""
     if not body_text.strip():
-        body_text = path.read_text(encoding="utf-8")
+        body_text = raw.decode("utf-8", errors="replace")
     labels = parsed.headers.get("X-Gmail-Labels", "").split(",") if parsed.headers else []
     labels = [label.strip() for label in labels if label.strip()]
     attachments = [
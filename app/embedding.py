@@ -1,9 +1,15 @@
 from __future__ import annotations
 
-import time
-from typing import Iterable, List
+import asyncio
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, List, Optional
 
-from openai import OpenAI, RateLimitError, APITimeoutError, APIConnectionError
+import numpy as np
+from openai import AsyncOpenAI, RateLimitError, APITimeoutError, APIConnectionError
 
 from .config import Settings
 
@@ -15,31 +21,65 @@ class InsufficientFundsError(Exception):
 
 class Embedder:
     def __init__(self, settings: Settings) -> None:
-        self._client = OpenAI(
+        # Not the shared client from openai_client: async connections are bound
+        # to an event loop, and this one runs on the embedder's private loop
+        self._client = AsyncOpenAI(
             api_key=settings.openai_api_key,
             timeout=60.0,  # 60 second timeout
             max_retries=3
         )
         self._model = settings.embedding_model
         self._max_batch_size = 2048  # OpenAI limit for embeddings API
+        # Requests run on a private event loop so sync callers on any thread
+        # (ingestion's embed workers, the retriever's search pool) share one
+        # connection pool and one concurrency cap
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="embedder-loop", daemon=True)
+        self._thread.start()
+        self._semaphore = asyncio.Semaphore(settings.embedding_max_concurrent)
 
-    def embed(self, texts: Iterable[str]) -> List[List[float]]:
+    def embed(self, texts: Iterable[str]) -> np.ndarray:
+        """Return a (len(texts), dims) float32 array of embeddings."""
         payload = list(texts)
         if not payload:
-            return []
-        
-        # If batch is too large, split it
-        if len(payload) > self._max_batch_size:
-            all_embeddings = []
-            for i in range(0, len(payload), self._max_batch_size):
-                batch = payload[i:i + self._max_batch_size]
-                batch_embeddings = self._embed_with_retry(batch, batch_num=i // self._max_batch_size + 1)
-                all_embeddings.extend(batch_embeddings)
-            return all_embeddings
-        else:
-            return self._embed_with_retry(payload)
+            return np.empty((0, 0), dtype=np.float32)
+        future = asyncio.run_coroutine_threadsafe(self._embed_batches(payload), self._loop)
+        return future.result()
+
+    def close(self) -> None:
+        """Close the HTTP client and stop the private event loop."""
+        if self._loop.is_closed():
+            return
+        asyncio.run_coroutine_threadsafe(self._client.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    async def _embed_batches(self, payload: List[str]) -> np.ndarray:
+        if len(payload) <= self._max_batch_size:
+            return await self._embed_with_retry(payload)
+
+        # If batch is too large, split it and dispatch the slices concurrently,
+        # writing each result straight into one preallocated output array
+        output: np.ndarray | None = None
+
+        async def embed_slice(start: int, batch_num: int) -> None:
+            nonlocal output
+            batch = payload[start:start + self._max_batch_size]
+            vectors = await self._embed_with_retry(batch, batch_num=batch_num)
+            if output is None:
+                output = np.empty((len(payload), vectors.shape[1]), dtype=np.float32)
+            output[start:start + len(batch)] = vectors
+
+        await asyncio.gather(
+            *(
+                embed_slice(start, batch_num)
+                for batch_num, start in enumerate(range(0, len(payload), self._max_batch_size), start=1)
+            )
+        )
+        return output
     
-    def _embed_with_retry(self, payload: List[str], batch_num: int | None = None) -> List[List[float]]:
+    async def _embed_with_retry(self, payload: List[str], batch_num: int | None = None) -> np.ndarray:
         """Embed with exponential backoff retry logic."""
         max_retries = 5
         base_delay = 1.0
@@ -48,14 +88,15 @@ class Embedder:
         
         for attempt in range(max_retries):
             try:
-                response = self._client.embeddings.create(model=self._model, input=payload)
-                return [item.embedding for item in response.data]
+                async with self._semaphore:
+                    response = await self._client.embeddings.create(model=self._model, input=payload)
+                return np.asarray([item.embedding for item in response.data], dtype=np.float32)
             
             except RateLimitError as e:
                 if attempt < max_retries - 1:
                     delay = base_delay * (2 ** attempt)
                     print(f"Rate limit hit for {batch_label} ({len(payload)} items), retrying in {delay:.1f}s... (attempt {attempt + 1}/{max_retries})")
-                    time.sleep(delay)
+                    await asyncio.sleep(delay)
                 else:
                     print(f"Rate limit exceeded after {max_retries} attempts for {batch_label}")
                     raise InsufficientFundsError(
@@ -67,7 +108,7 @@ class Embedder:
                 if attempt < max_retries - 1:
                     delay = base_delay * (2 ** attempt)
                     print(f"API timeout/connection error for {batch_label}, retrying in {delay:.1f}s... (attempt {attempt + 1}/{max_retries})")
-                    time.sleep(delay)
+                    await asyncio.sleep(delay)
                 else:
                     print(f"API timeout/connection failed after {max_retries} attempts for {batch_label}")
                     raise
@@ -78,3 +119,99 @@ class Embedder:
         
         # Should never reach here
         raise RuntimeError(f"Failed to embed {batch_label} after {max_retries} attempts")
+
+
+class ChunkEmbeddingCache:
+    """
+    Content-addressed LRU of chunk embeddings, keyed by a hash of the model
+    name and chunk text. Quoted replies repeat the same chunks across a
+    thread, so ingestion only pays the API for text it hasn't seen. Vectors
+    are kept as float16, which halves memory and the saved file; the
+    rounding is far below what changes a nearest-neighbour ranking.
+    """
+    
+    def __init__(self, model: str, max_entries: int) -> None:
+        self._max_entries = max_entries
+        self._base_hash = hashlib.blake2b(model.encode("utf-8") + b"\0", digest_size=16)
+        self._vectors: OrderedDict[bytes, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self._dirty = False  # Entries added since the last load/save
+        self.hits = 0
+        self.misses = 0
+    
+    def __len__(self) -> int:
+        return len(self._vectors)
+    
+    def _key(self, text: str) -> bytes:
+        hasher = self._base_hash.copy()
+        hasher.update(text.encode("utf-8", errors="surrogatepass"))
+        return hasher.digest()
+    
+    def embed(self, embedder: "Embedder", texts: List[str]) -> np.ndarray:
+        """Embed texts through the cache; only unseen texts reach the API, once each."""
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        keys = [self._key(text) for text in texts]
+        with self._lock:
+            found: List[Optional[np.ndarray]] = []
+            for key in keys:
+                vector = self._vectors.get(key)
+                if vector is not None:
+                    self._vectors.move_to_end(key)
+                found.append(vector)
+        
+        missing = {key: text for key, text, vector in zip(keys, texts, found) if vector is None}
+        fresh: dict[bytes, np.ndarray] = {}
+        if missing:
+            vectors = embedder.embed(list(missing.values()))
+            fresh = dict(zip(missing, vectors))
+            with self._lock:
+                for key, vector in fresh.items():
+                    self._vectors[key] = vector.astype(np.float16)
+                self._dirty = True
+                while len(self._vectors) > self._max_entries:
+                    self._vectors.popitem(last=False)
+        
+        with self._lock:
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+        
+        sample = next(iter(fresh.values())) if fresh else found[0]
+        output = np.empty((len(texts), sample.shape[0]), dtype=np.float32)
+        for row, (key, vector) in enumerate(zip(keys, found)):
+            output[row] = vector if vector is not None else fresh[key]
+        return output
+    
+    @classmethod
+    def load(cls, path: Path, model: str, max_entries: int) -> "ChunkEmbeddingCache":
+        cache = cls(model, max_entries)
+        if not path.exists():
+            return cache
+        try:
+            with np.load(path) as data:
+                keys, vectors = data["keys"], data["vectors"].astype(np.float16, copy=False)
+            for key, vector in zip(keys[-max_entries:], vectors[-max_entries:]):
+                cache._vectors[key.tobytes()] = vector
+        except Exception as e:
+            print(f"Warning: Could not load embedding cache: {e}")
+        return cache
+    
+    def save(self, path: Path) -> None:
+        """
+        Persist via temp file + rename so an interrupted save keeps the old
+        cache. A run that embedded nothing new leaves the file untouched.
+        """
+        with self._lock:
+            if not self._dirty or not self._vectors:
+                return
+            self._dirty = False
+            keys = np.frombuffer(b"".join(self._vectors.keys()), dtype=np.uint8).reshape(-1, 16)
+            vectors = np.stack(list(self._vectors.values()))
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                np.savez(f, keys=keys, vectors=vectors)
+            os.replace(tmp_path, path)
+        except BaseException:
+            self._dirty = True  # Not on disk yet; the next save retries
+            raise
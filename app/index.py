@@ -4,12 +4,13 @@ from dataclasses import dataclass
 from typing import Iterable, List, Optional
 
 import chromadb
+import numpy as np
 from chromadb import errors as chroma_errors
 
 from .config import Settings
 
 
-@dataclass
+@dataclass(slots=True)
 class IndexedChunk:
     chunk_id: str
     message_id: str
@@ -24,6 +25,29 @@ class IndexedChunk:
     distance: float
 
 
+def _to_chroma_embeddings(vectors: np.ndarray | List[List[float]]) -> List[List[float]]:
+    """Chroma validates embeddings as plain lists, so unbox float32 arrays at the boundary."""
+    return np.asarray(vectors, dtype=np.float32).tolist()
+
+
+def _make_chunk(chunk_id: str, metadata: dict, doc: str, distance: float) -> IndexedChunk:
+    get = metadata.get
+    message_id = get("message_id", "unknown")
+    return IndexedChunk(
+        chunk_id=chunk_id,
+        message_id=message_id,
+        thread_id=get("thread_id", message_id),
+        subject=get("subject", "(no subject)"),
+        from_address=get("from_address", "unknown"),
+        to=get("to", []),
+        date=get("date", ""),
+        chunk_index=get("chunk_index", 0),
+        snippet=doc,
+        raw_path=get("raw_path", ""),
+        distance=distance,
+    )
+
+
 class EmailIndex:
     def __init__(self, settings: Settings) -> None:
         self._client = chromadb.PersistentClient(path=str(settings.index_dir))
@@ -37,12 +61,12 @@ class EmailIndex:
         self,
         *,
         documents: Iterable[str],
-        embeddings: Iterable[List[float]],
+        embeddings: np.ndarray | Iterable[List[float]],
         metadatas: Iterable[dict],
         ids: Iterable[str],
     ) -> None:
         docs = list(documents)
-        embeds = list(embeddings)
+        embeds = embeddings if isinstance(embeddings, np.ndarray) else np.asarray(list(embeddings), dtype=np.float32)
         metas = list(metadatas)
         ids_list = list(ids)
         if not docs:
@@ -52,7 +76,7 @@ class EmailIndex:
         self._collection.add(
             ids=ids_list,
             documents=docs,
-            embeddings=embeds,
+            embeddings=_to_chroma_embeddings(embeds),
             metadatas=metas,
         )
 
@@ -69,38 +93,50 @@ class EmailIndex:
     def query(
         self,
         *,
-        query_embedding: List[float],
+        query_embedding: np.ndarray | List[float],
         n_results: int,
         where: Optional[dict] = None,
     ) -> List[IndexedChunk]:
-        result = self._collection.query(
+        return self.query_many(
             query_embeddings=[query_embedding],
             n_results=n_results,
             where=where,
-        )
-        if not result["ids"] or not result["ids"][0]:
+        )[0]
+
+    def query_many(
+        self,
+        *,
+        query_embeddings: np.ndarray | List[List[float]],
+        n_results: int,
+        where: Optional[dict] = None,
+    ) -> List[List[IndexedChunk]]:
+        """
+        Run several nearest-neighbour searches in one Chroma call.
+        Returns one hit list per query embedding, in input order.
+        """
+        if len(query_embeddings) == 0:
             return []
-        hits: List[IndexedChunk] = []
-        for idx, chunk_id in enumerate(result["ids"][0]):
-            metadata = result["metadatas"][0][idx]
-            doc = result["documents"][0][idx]
-            distance = result["distances"][0][idx] if result.get("distances") else 0.0
-            hits.append(
-                IndexedChunk(
-                    chunk_id=chunk_id,
-                    message_id=metadata.get("message_id", "unknown"),
-                    thread_id=metadata.get("thread_id", metadata.get("message_id", "unknown")),
-                    subject=metadata.get("subject", "(no subject)"),
-                    from_address=metadata.get("from_address", "unknown"),
-                    to=metadata.get("to", []),
-                    date=metadata.get("date", ""),
-                    chunk_index=metadata.get("chunk_index", 0),
-                    snippet=doc,
-                    raw_path=metadata.get("raw_path", ""),
-                    distance=distance,
-                )
-            )
-        return hits
+        result = self._collection.query(
+            query_embeddings=_to_chroma_embeddings(query_embeddings),
+            n_results=n_results,
+            where=where,
+        )
+        all_ids = result["ids"] or []
+        all_metas = result["metadatas"] or []
+        all_docs = result["documents"] or []
+        all_dists = result.get("distances")
+        hits_per_query: List[List[IndexedChunk]] = []
+        for q in range(len(query_embeddings)):
+            if q >= len(all_ids) or not all_ids[q]:
+                hits_per_query.append([])
+                continue
+            ids = all_ids[q]
+            dists = all_dists[q] if all_dists else [0.0] * len(ids)
+            hits_per_query.append([
+                _make_chunk(chunk_id, metadata, doc, distance)
+                for chunk_id, metadata, doc, distance in zip(ids, all_metas[q], all_docs[q], dists)
+            ])
+        return hits_per_query
 
     def get_chunks_by_ids(self, chunk_ids: List[str]) -> dict[str, IndexedChunk]:
         """
@@ -123,23 +159,9 @@ class EmailIndex:
                     include=["documents", "metadatas"]
                 )
                 
-                for idx, chunk_id in enumerate(result["ids"]):
-                    metadata = result["metadatas"][idx]
-                    doc = result["documents"][idx]
-                    
-                    chunks_by_id[chunk_id] = IndexedChunk(
-                        chunk_id=chunk_id,
-                        message_id=metadata.get("message_id", "unknown"),
-                        thread_id=metadata.get("thread_id", metadata.get("message_id", "unknown")),
-                        subject=metadata.get("subject", "(no subject)"),
-                        from_address=metadata.get("from_address", "unknown"),
-                        to=metadata.get("to", []),
-                        date=metadata.get("date", ""),
-                        chunk_index=metadata.get("chunk_index", 0),
-                        snippet=doc,
-                        raw_path=metadata.get("raw_path", ""),
-                        distance=0.0,  # Not applicable when fetching by ID
-                    )
+                for chunk_id, metadata, doc in zip(result["ids"], result["metadatas"], result["documents"]):
+                    # Distance is not applicable when fetching by ID
+                    chunks_by_id[chunk_id] = _make_chunk(chunk_id, metadata, doc, 0.0)
             
             return chunks_by_id
         except Exception as e:
@@ -1,24 +1,29 @@
 from __future__ import annotations
 
-import json
-import mailbox
-import pickle
+import multiprocessing
+import os
+import queue
 import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, Dict, Generator, Iterator, List, Optional, Tuple
 
 import mailparser
+import orjson
 import yaml
-from email import message_from_string
-from rank_bm25 import BM25Okapi
+from email.header import decode_header, make_header
 from tqdm import tqdm
 
+from .bm25 import CompactBM25, tokenize as bm25_tokenize
 from .chunking import make_chunks
 from .config import Settings, get_settings
-from .email_parser import ParsedEmail, parse_email_file
-from .embedding import Embedder, InsufficientFundsError
+from .email_parser import ParsedEmail, parse_email_file, parse_sender_and_subject, to_iso8601_utc
+from .embedding import ChunkEmbeddingCache, Embedder, InsufficientFundsError
 from .index import EmailIndex
 
 
@@ -49,7 +54,15 @@ class IngestionCheckpoint:
             "total_emails_filtered": self.total_emails_filtered,
             "timestamp": self.timestamp,
         }
-        path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        # Write to a temp file and rename so a crash never leaves a torn checkpoint
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        fd = os.open(tmp_path, _OPEN_FLAGS, 0o644)
+        try:
+            os.write(fd, orjson.dumps(data, option=orjson.OPT_INDENT_2))
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
     
     @classmethod
     def load(cls, path: Path) -> Optional["IngestionCheckpoint"]:
@@ -57,7 +70,7 @@ class IngestionCheckpoint:
         if not path.exists():
             return None
         try:
-            data = json.loads(path.read_text(encoding="utf-8"))
+            data = orjson.loads(path.read_bytes())
             return cls(**data)
         except Exception as e:
             print(f"Warning: Could not load checkpoint: {e}")
@@ -68,30 +81,324 @@ def _ensure_directory(path: Path) -> None:
     path.mkdir(parents=True, exist_ok=True)
 
 
-def _persist_email_json(email: ParsedEmail, processed_dir: Path) -> Path:
-    destination = processed_dir / f"{email.message_id}.json"
-    destination.write_text(email.to_json(), encoding="utf-8")
-    return destination
+_OPEN_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+
+
+class JsonSpooler:
+    """
+    Writes processed email JSON on a background thread, draining the queue
+    in groups so per-file open/write/close stays off the embedding loop.
+    Call flush() before saving a checkpoint so it acts as a durability barrier.
+    """
+    
+    def __init__(self, processed_dir: Path, *, max_batch: int = 64, max_wait: float = 0.01) -> None:
+        self._processed_dir = processed_dir
+        self._max_batch = max_batch
+        self._max_wait = max_wait
+        self._queue: queue.Queue = queue.Queue(maxsize=256)
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="json-spooler", daemon=True)
+        self._thread.start()
+    
+    def submit(self, email: ParsedEmail) -> None:
+        self._queue.put(email)
+    
+    def flush(self) -> None:
+        """Block until every submitted email has been written."""
+        self._queue.join()
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+    
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+    
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self._max_wait
+            while len(batch) < self._max_batch and batch[-1] is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._write_batch([email for email in batch if email is not None])
+            except BaseException as e:  # surfaced to the caller on flush/close
+                self._error = e
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if batch[-1] is None:
+                return
+    
+    def _write_batch(self, emails: List[ParsedEmail]) -> None:
+        for email in emails:
+            destination = self._processed_dir / f"{email.message_id}.json"
+            fd = os.open(destination, _OPEN_FLAGS, 0o644)
+            try:
+                os.write(fd, email.to_json())
+            finally:
+                os.close(fd)
+
+
+_ANGLE_ADDRESS_RE = re.compile(r'<([^>]+)>')
+_BARE_ADDRESS_RE = re.compile(r'[\w\.-]+@[\w\.-]+')
+_REGEX_METACHARS = frozenset(".^$*+?{}[]\\|()")
+
+
+def _pattern_literal(pattern: str) -> Optional[str]:
+    """Return the literal text a regex matches, or None if it uses regex syntax."""
+    chars: List[str] = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\" and i + 1 < len(pattern) and not pattern[i + 1].isalnum():
+            chars.append(pattern[i + 1])  # Escaped punctuation like \. is literal
+            i += 2
+            continue
+        if char in _REGEX_METACHARS:
+            return None
+        chars.append(char)
+        i += 1
+    return "".join(chars)
+
+
+def _split_sender_patterns(patterns: List[str]) -> Tuple[tuple, tuple, Optional[re.Pattern]]:
+    """
+    Split blocked sender patterns into anchored literal prefixes, plain
+    literal substrings, and a combined regex for whatever is left.
+    """
+    prefixes: List[str] = []
+    substrings: List[str] = []
+    regexes: List[str] = []
+    for pattern in patterns:
+        anchored = pattern.startswith("^")
+        literal = _pattern_literal(pattern[1:] if anchored else pattern)
+        if literal is None:
+            try:
+                re.compile(pattern)  # Surface a bad pattern by name, not as a broken alternation
+            except re.error as e:
+                raise ValueError(f"Invalid blocked_sender_patterns entry {pattern!r}: {e}") from e
+            regexes.append(pattern)
+        elif anchored:
+            prefixes.append(literal.lower())
+        else:
+            substrings.append(literal.lower())
+    # One alternation so the regex engine scans each sender once
+    combined = re.compile("|".join(f"(?:{p})" for p in regexes), re.IGNORECASE) if regexes else None
+    return tuple(prefixes), tuple(substrings), combined
+
+
+@dataclass(frozen=True)
+class CompiledFilters:
+    """Email filter config preprocessed once for fast per-email checks."""
+    conversations_only: bool
+    whitelist: frozenset[str]
+    preserve_prefixes: tuple[str, ...]
+    blocked_senders: frozenset[str]
+    blocked_prefixes: tuple[str, ...]
+    blocked_substrings: tuple[str, ...]
+    blocked_pattern: Optional[re.Pattern]
+    blocked_domains: frozenset[str]
+    semi_trusted_domains: frozenset[str]
+    transactional_keywords: tuple[str, ...]
+    
+    @classmethod
+    def from_config(cls, filters: dict) -> "CompiledFilters":
+        """Build from the raw email_filters.yaml mapping."""
+        blocked_prefixes, blocked_substrings, blocked_pattern = _split_sender_patterns(
+            filters.get('blocked_sender_patterns') or []
+        )
+        return cls(
+            conversations_only=bool(filters.get('conversations_only', False)),
+            whitelist=frozenset(s.lower() for s in filters.get('whitelisted_senders') or []),
+            preserve_prefixes=tuple(filters.get('preserve_conversation_prefixes') or []),
+            blocked_senders=frozenset(s.lower() for s in filters.get('blocked_senders') or []),
+            blocked_prefixes=blocked_prefixes,
+            blocked_substrings=blocked_substrings,
+            blocked_pattern=blocked_pattern,
+            blocked_domains=frozenset(d.lower() for d in filters.get('blocked_domains') or []),
+            semi_trusted_domains=frozenset(d.lower() for d in filters.get('semi_trusted_domains') or []),
+            transactional_keywords=tuple(k.lower() for k in filters.get('transactional_subject_keywords') or []),
+        )
+
+
+def _walk_files(root: Path) -> List[Path]:
+    """Recursively list regular files under root, sorted by path."""
+    file_paths: List[str] = []
+    stack = [str(root)]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        with entries:
+            for entry in entries:
+                # DirEntry caches the file type from readdir, so no extra stat
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file():
+                    file_paths.append(entry.path)
+    # Build Path objects only for files that survive, then sort by path parts
+    files = [Path(path) for path in file_paths]
+    files.sort()
+    return files
+
+
+def _is_mbox_file(path: Path) -> bool:
+    return path.suffix == ".mbox" or "mbox" in path.name.lower()
+
+
+# Parser pools start from a clean interpreter: ingestion already runs the
+# embedder's event loop, the JSON spooler and the parser thread, and forking
+# a process with live threads can copy held locks into the children
+_PARSE_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+_EMAIL_FILE_PARSE_BATCH = 64  # Files per worker task, amortizing IPC
+
+
+def _parse_email_file_batch(paths: List[Path]) -> List[ParsedEmail]:
+    return [parse_email_file(path) for path in paths]
+
+
+def _parse_email_files_parallel(paths: List[Path]) -> Iterator[ParsedEmail]:
+    """
+    Parse individual email files across CPU cores.
+    Yields ParsedEmail objects in the same order as paths, with only a
+    bounded number of batches in flight so a slow consumer holds back parsing.
+    """
+    if not paths:
+        return
+    workers = os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=_PARSE_MP_CONTEXT)
+    pending: deque[Future] = deque()
+    try:
+        for start in range(0, len(paths), _EMAIL_FILE_PARSE_BATCH):
+            pending.append(executor.submit(_parse_email_file_batch, paths[start:start + _EMAIL_FILE_PARSE_BATCH]))
+            # Keep every worker busy without parsing the whole list ahead
+            while len(pending) > workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
 
 
-def _load_email_filters(settings: Settings) -> dict:
-    """Load email filtering configuration from YAML file."""
+def _load_email_filters(settings: Settings) -> Optional[CompiledFilters]:
+    """Load email filtering configuration from YAML file, compiled for matching."""
     config_path = Path(settings.config_dir) / "email_filters.yaml"
     if not config_path.exists():
         print(f"Warning: Email filter config not found at {config_path}, filtering disabled")
-        return {}
+        return None
     
     with open(config_path, 'r') as f:
-        return yaml.safe_load(f)
+        filters = yaml.safe_load(f)
+    return CompiledFilters.from_config(filters) if filters else None
+
+
+_PREFIX_RE = re.compile(r'^(?:re|fwd|fw):\s*', re.IGNORECASE)
 
 
 def _normalize_subject(subject: str) -> str:
     """Normalize email subject by removing Re:/Fwd: prefixes and whitespace."""
-    normalized = re.sub(r'^(Re|RE|Fwd|FWD|Fw):\s*', '', subject, flags=re.IGNORECASE).strip()
-    return normalized.lower()  # Case-insensitive comparison
+    return _PREFIX_RE.sub('', subject, count=1).strip().lower()  # Case-insensitive comparison
+
+
+MboxOffsets = List[Tuple[int, int]]
+
+
+def _scan_mbox(path: Path) -> Iterator[Tuple[int, int, bytes]]:
+    """
+    Stream an MBOX file once and yield (offset, length, raw_subject) per message.
+    
+    Only header lines are inspected; bodies are skipped over, and no message
+    objects are built. Messages start at lines beginning with "From ", the
+    same rule mailbox.mbox uses.
+    """
+    start: Optional[int] = None
+    offset = 0
+    subject = b""
+    in_headers = False
+    in_subject = False
+    with open(path, "rb", buffering=1 << 20) as f:
+        for line in f:
+            if line.startswith(b"From "):
+                if start is not None:
+                    yield start, offset - start, subject
+                start = offset
+                subject = b""
+                in_headers = True
+                in_subject = False
+            elif in_headers:
+                if line in (b"\n", b"\r\n"):
+                    in_headers = False
+                elif in_subject and line[:1] in (b" ", b"\t"):
+                    subject += line  # Folded continuation line
+                elif line[:8].lower() == b"subject:" and not subject:
+                    subject = line[8:]
+                    in_subject = True
+                else:
+                    in_subject = False
+            offset += len(line)
+    if start is not None:
+        yield start, offset - start, subject
+
+
+def _decode_subject(raw: bytes) -> str:
+    """Decode a raw Subject header value, including RFC 2047 encoded words."""
+    text = raw.decode("utf-8", errors="replace").replace("\r", "").replace("\n", "").strip()
+    if not text:
+        return "(no subject)"
+    try:
+        return str(make_header(decode_header(text)))
+    except Exception:
+        return text
+
+
+_MBOX_FROM_RE = re.compile(rb"\nFrom ")
+
+
+def _read_mbox_messages(path: Path, offsets: Optional[MboxOffsets] = None, chunk_size: int = 4 << 20) -> Iterator[bytes]:
+    """
+    Yield the raw bytes of each message in an MBOX file, "From " line included.
+    
+    With offsets from a previous _scan_mbox pass, each message is read by
+    seeking straight to it; otherwise the file is read in large chunks and
+    split on "From " lines, carrying the partial last message forward.
+    """
+    with open(path, "rb") as f:
+        if offsets is not None:
+            for offset, length in offsets:
+                f.seek(offset)
+                yield f.read(length)
+            return
+        buffer = b""
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            # Back up far enough to catch a separator split across chunks
+            search_from = max(len(buffer) - len(b"\nFrom "), 0)
+            buffer += chunk
+            start = 0
+            for match in _MBOX_FROM_RE.finditer(buffer, search_from):
+                boundary = match.start() + 1
+                yield buffer[start:boundary]
+                start = boundary
+            buffer = buffer[start:]
+        if buffer:
+            yield buffer
 
 
-def _build_thread_counts(files: List[Path]) -> dict[str, int]:
+def _build_thread_counts(files: List[Path]) -> Tuple[dict[str, int], Dict[Path, MboxOffsets]]:
     """
     Build a map of normalized subject -> email count by streaming mbox files.
     
@@ -102,11 +409,14 @@ def _build_thread_counts(files: List[Path]) -> dict[str, int]:
         files: List of file paths to scan (mbox files and individual emails)
     
     Returns:
-        Dictionary mapping normalized subject to count of emails with that subject
+        Dictionary mapping normalized subject to count of emails with that subject,
+        and the (offset, length) of every message in each mbox file so the parse
+        pass can seek to messages instead of rescanning the file
     """
     from collections import Counter
     
     thread_counts = Counter()
+    mbox_offsets: Dict[Path, MboxOffsets] = {}
     total_scanned = 0
     
     print("\n" + "=" * 100)
@@ -114,29 +424,27 @@ def _build_thread_counts(files: List[Path]) -> dict[str, int]:
     print("=" * 100)
     
     for file_path in files:
-        if not file_path.is_file():
-            continue
-        
         # Handle MBOX files
-        if file_path.suffix == ".mbox" or "mbox" in file_path.name.lower():
+        if _is_mbox_file(file_path):
             print(f"\nScanning: {file_path.name}")
             
             try:
-                mbox = mailbox.mbox(str(file_path))
-                for idx, message in enumerate(mbox):
-                    if idx % 1000 == 0 and idx > 0:
-                        print(f"  Scanned {idx} emails, found {len(thread_counts)} unique subjects...", end="\r")
+                offsets: MboxOffsets = []
+                normalize, decode = _normalize_subject, _decode_subject  # Local lookups in the hot loop
+                for offset, length, raw_subject in _scan_mbox(file_path):
+                    offsets.append((offset, length))
+                    if len(offsets) % 1000 == 0:
+                        print(f"  Scanned {len(offsets)} emails, found {len(thread_counts)} unique subjects...", end="\r")
                     
                     try:
-                        # Extract only the subject (minimal parsing)
-                        subject = message.get('subject', '(no subject)')
-                        normalized = _normalize_subject(subject)
+                        normalized = normalize(decode(raw_subject))
                         thread_counts[normalized] += 1
                         total_scanned += 1
                     except Exception:
                         continue
                 
-                print(f"  Scanned {idx + 1} emails from {file_path.name}                    ")
+                mbox_offsets[file_path] = offsets
+                print(f"  Scanned {len(offsets)} emails from {file_path.name}                    ")
             except Exception as e:
                 print(f"  Error scanning {file_path.name}: {e}")
                 continue
@@ -150,22 +458,29 @@ def _build_thread_counts(files: List[Path]) -> dict[str, int]:
             except Exception:
                 continue
     
-    # Count threads (subjects with 2+ emails)
-    multi_email_threads = sum(1 for count in thread_counts.values() if count >= 2)
-    single_email_threads = sum(1 for count in thread_counts.values() if count == 1)
+    # Count threads (subjects with 2+ emails) in one pass over the counts
+    multi_email_threads = 0
+    multi_email_emails = 0
+    single_email_threads = 0
+    for count in thread_counts.values():
+        if count >= 2:
+            multi_email_threads += 1
+            multi_email_emails += count
+        elif count == 1:
+            single_email_threads += 1
     
     print(f"\n✓ Thread map built!")
     print(f"  Total emails scanned:     {total_scanned:,}")
     print(f"  Unique subjects:          {len(thread_counts):,}")
-    print(f"  Multi-email threads:      {multi_email_threads:,} subjects ({sum(count for count in thread_counts.values() if count >= 2):,} emails)")
+    print(f"  Multi-email threads:      {multi_email_threads:,} subjects ({multi_email_emails:,} emails)")
     print(f"  Single-email threads:     {single_email_threads:,} subjects ({single_email_threads:,} emails)")
     print(f"  Potential filter savings: {single_email_threads:,} emails ({single_email_threads/total_scanned*100:.1f}%)")
     print("=" * 100)
     
-    return dict(thread_counts)
+    return thread_counts, mbox_offsets  # Counter is already a dict; skip the copy
 
 
-def _should_filter_email(from_addr: str, subject: str, filters: dict, thread_counts: Optional[dict] = None) -> bool:
+def _should_filter_email(from_addr: str, subject: str, filters: Optional[CompiledFilters], thread_counts: Optional[dict] = None) -> bool:
     """
     Return True if email should be FILTERED OUT (blocked).
     
@@ -178,35 +493,31 @@ def _should_filter_email(from_addr: str, subject: str, filters: dict, thread_cou
     6. Blocked domains (full block)
     7. Semi-trusted domains + subject keywords
     """
-    if not filters:
+    if filters is None:
         return False
     
     from_addr = from_addr.lower()
     
     # Extract email address from "Name <email@domain.com>" format
-    email_match = re.search(r'<([^>]+)>', from_addr)
+    email_match = _ANGLE_ADDRESS_RE.search(from_addr)
     if email_match:
-        from_addr = email_match.group(1).lower()
+        from_addr = email_match.group(1)
     else:
         # Try to find email without brackets
-        email_match = re.search(r'[\w\.-]+@[\w\.-]+', from_addr)
+        email_match = _BARE_ADDRESS_RE.search(from_addr)
         if email_match:
-            from_addr = email_match.group(0).lower()
+            from_addr = email_match.group(0)
     
     # 1. Check whitelist first (always keep)
-    whitelisted = filters.get('whitelisted_senders') or []
-    if from_addr in [s.lower() for s in whitelisted]:
+    if from_addr in filters.whitelist:
         return False
     
     # 2. Check if subject starts with conversation prefix (always keep)
-    prefixes = filters.get('preserve_conversation_prefixes') or []
-    for prefix in prefixes:
-        if subject.strip().startswith(prefix):
-            return False
+    if subject.strip().startswith(filters.preserve_prefixes):
+        return False
     
     # 3. Check thread count (if conversations_only mode enabled)
-    conversations_only = filters.get('conversations_only', False)
-    if conversations_only and thread_counts is not None:
+    if filters.conversations_only and thread_counts is not None:
         normalized = _normalize_subject(subject)
         count = thread_counts.get(normalized, 0)
         if count < 2:
@@ -214,124 +525,231 @@ def _should_filter_email(from_addr: str, subject: str, filters: dict, thread_cou
             return True
     
     # 4. Check blocked senders (exact match)
-    blocked_senders = filters.get('blocked_senders') or []
-    if from_addr in [s.lower() for s in blocked_senders]:
+    if from_addr in filters.blocked_senders:
         return True
     
-    # 5. Check blocked sender patterns (regex)
-    blocked_patterns = filters.get('blocked_sender_patterns') or []
-    for pattern in blocked_patterns:
-        if re.search(pattern, from_addr, re.IGNORECASE):
+    # 5. Check blocked sender patterns (literal prefixes/substrings first, then regex)
+    if from_addr.startswith(filters.blocked_prefixes):
+        return True
+    for substring in filters.blocked_substrings:
+        if substring in from_addr:
             return True
+    if filters.blocked_pattern is not None and filters.blocked_pattern.search(from_addr):
+        return True
     
     # 6. Check blocked domains (full block)
     domain = from_addr.split('@')[-1] if '@' in from_addr else ''
-    blocked_domains = filters.get('blocked_domains') or []
-    if domain in [d.lower() for d in blocked_domains]:
+    if domain in filters.blocked_domains:
         return True
     
     # 7. Check semi-trusted domains with subject filtering
-    semi_trusted = filters.get('semi_trusted_domains') or []
-    if domain in [d.lower() for d in semi_trusted]:
+    if domain in filters.semi_trusted_domains:
         subject_lower = subject.lower()
-        keywords = filters.get('transactional_subject_keywords') or []
-        for keyword in keywords:
-            if keyword.lower() in subject_lower:
+        for keyword in filters.transactional_keywords:
+            if keyword in subject_lower:
                 return True
     
     return False
 
 
-def _parse_mbox_file(path: Path, limit: int | None = None, skip: int = 0) -> List[ParsedEmail]:
-    """Parse an MBOX file and return list of ParsedEmail objects.
+def _parse_mbox_message(raw_message: bytes, idx: int, path: Path) -> Optional[ParsedEmail]:
+    """Parse one raw MBOX message. Runs in a worker process."""
+    try:
+        parsed = mailparser.parse_from_bytes(raw_message)
+        
+        # Extract fields similar to parse_email_file
+        message_id = parsed.message_id or f"mbox-{idx}"
+        subject = parsed.subject or "(no subject)"
+        
+        # Use normalized subject as thread_id for better grouping
+        # Remove Re:, Fwd:, FWD:, etc. and strip whitespace
+        normalized_subject = _PREFIX_RE.sub('', subject, count=1).strip()
+        thread_id = normalized_subject or message_id
+        
+        from_address = "unknown"
+        if parsed.from_:
+            for _, addr in parsed.from_:
+                if addr:
+                    from_address = addr
+                    break
+        
+        to = [addr for _, addr in parsed.to] if parsed.to else []
+        to = [addr for addr in to if addr]
+        cc = [addr for _, addr in parsed.cc] if parsed.cc else []
+        cc = [addr for addr in cc if addr]
+        
+        date_str = to_iso8601_utc(parsed.date)
+        
+        body_text = parsed.text_plain[0] if parsed.text_plain else parsed.body
+        body_text = body_text or ""
+        
+        labels = parsed.headers.get("X-Gmail-Labels", "").split(",") if parsed.headers else []
+        labels = [label.strip() for label in labels if label.strip()]
+        
+        attachments = []
+        
+        return ParsedEmail(
+            message_id=message_id,
+            thread_id=thread_id,
+            subject=subject,
+            from_address=from_address,
+            to=to,
+            cc=cc,
+            date=date_str,
+            body_text=body_text,
+            labels=labels,
+            attachments=attachments,
+            raw_path=path,
+        )
+    except Exception as e:
+        print(f"Error parsing email {idx}: {e}")
+        return None
+
+
+def _parse_mbox_batch(batch: List[Tuple[int, bytes]], path: Path) -> List[Optional[ParsedEmail]]:
+    return [_parse_mbox_message(raw_message, idx, path) for idx, raw_message in batch]
+
+
+_MBOX_PARSE_BATCH = 64  # Messages per worker task, amortizing IPC
+
+
+def _parse_mbox_file(
+    path: Path,
+    limit: int | None = None,
+    skip: int = 0,
+    offsets: Optional[MboxOffsets] = None,
+    should_skip: Optional[Callable[[str, str], bool]] = None,
+    filtered_before: int = 0,
+) -> Generator[Tuple[ParsedEmail, int], None, int]:
+    """Parse an MBOX file, yielding (ParsedEmail, filtered count) one at a time.
+    
+    MIME parsing runs on a process pool in batches; results are yielded in
+    file order, with only a bounded number of batches in flight. The count
+    paired with each email is how many messages should_skip rejected before
+    it (starting from filtered_before), even though filtering runs ahead of
+    the parsed results. Returns the count after the whole file.
     
     Args:
         path: Path to MBOX file
         limit: Maximum number of emails to parse (None = all)
         skip: Number of emails to skip from start (for resuming)
+        offsets: Message offsets from the thread-count pass, if available
+        should_skip: Called with (from_address, subject) read from the headers
+            alone; messages it rejects never reach the full MIME parser
+        filtered_before: Messages already rejected in earlier files
     """
     print(f"Parsing MBOX file: {path}")
     if skip > 0:
         print(f"Skipping first {skip} emails (resuming from checkpoint)")
     if limit:
         print(f"Will process up to {limit} emails")
-    mbox = mailbox.mbox(str(path))
-    
-    emails = []
-    for idx, message in enumerate(mbox):
-        # Skip emails we've already processed
-        if idx < skip:
-            if idx % 100 == 0 and idx > 0:
-                print(f"Skipping to checkpoint... {idx}/{skip}", end="\r")
-            continue
-        
-        if limit and idx >= (skip + limit):
-            print(f"\nReached limit of {limit} emails")
-            break
-        
-        if idx % 10 == 0:
-            print(f"Parsing email {idx}...", end="\r")
-            
-        try:
-            parsed = mailparser.parse_from_bytes(bytes(message))
-            
-            # Extract fields similar to parse_email_file
-            message_id = parsed.message_id or f"mbox-{idx}"
-            subject = parsed.subject or "(no subject)"
-            
-            # Use normalized subject as thread_id for better grouping
-            # Remove Re:, Fwd:, FWD:, etc. and strip whitespace
-            normalized_subject = re.sub(r'^(Re|RE|Fwd|FWD|Fw):\s*', '', subject, flags=re.IGNORECASE).strip()
-            thread_id = normalized_subject or message_id
-            
-            from_address = "unknown"
-            if parsed.from_:
-                for _, addr in parsed.from_:
-                    if addr:
-                        from_address = addr
-                        break
-            
-            to = [addr for _, addr in parsed.to] if parsed.to else []
-            to = [addr for addr in to if addr]
-            cc = [addr for _, addr in parsed.cc] if parsed.cc else []
-            cc = [addr for addr in cc if addr]
-            
-            import pendulum
-            date_str = parsed.date if isinstance(parsed.date, str) else parsed.date.isoformat() if parsed.date else None
-            if not date_str:
-                date_str = pendulum.now("UTC").to_iso8601_string()
-            else:
-                date_str = pendulum.parse(str(date_str)).to_iso8601_string()
-            
-            body_text = parsed.text_plain[0] if parsed.text_plain else parsed.body
-            body_text = body_text or ""
+    if offsets is not None:
+        # Known offsets let us jump straight past already-processed emails
+        messages = _read_mbox_messages(path, offsets[skip:skip + limit] if limit else offsets[skip:])
+        start_idx = skip
+    else:
+        messages = _read_mbox_messages(path)
+        start_idx = 0
+    
+    workers = os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=_PARSE_MP_CONTEXT)
+    pending: deque[Tuple[Future, List[int]]] = deque()
+    batch: List[Tuple[int, bytes]] = []
+    batch_filtered: List[int] = []  # Rejected-so-far count for each batch entry
+    filtered = filtered_before
+    parsed_count = 0
+    try:
+        for idx, raw_message in enumerate(messages, start=start_idx):
+            # Skip emails we've already processed
+            if idx < skip:
+                if idx % 100 == 0 and idx > 0:
+                    print(f"Skipping to checkpoint... {idx}/{skip}", end="\r")
+                continue
             
-            labels = parsed.headers.get("X-Gmail-Labels", "").split(",") if parsed.headers else []
-            labels = [label.strip() for label in labels if label.strip()]
+            if limit and idx >= (skip + limit):
+                print(f"\nReached limit of {limit} emails")
+                break
             
-            attachments = []
+            if idx % 10 == 0:
+                print(f"Parsing email {idx}...", end="\r")
             
-            email = ParsedEmail(
-                message_id=message_id,
-                thread_id=thread_id,
-                subject=subject,
-                from_address=from_address,
-                to=to,
-                cc=cc,
-                date=date_str,
-                body_text=body_text,
-                labels=labels,
-                attachments=attachments,
-                raw_path=path,
-            )
-            emails.append(email)
+            try:
+                if should_skip is not None and should_skip(*parse_sender_and_subject(raw_message)):
+                    filtered += 1
+                    continue
+            except Exception as e:
+                print(f"Error parsing email {idx}: {e}")
+                continue
             
-        except Exception as e:
-            print(f"Error parsing email {idx}: {e}")
-            continue
+            batch.append((idx, raw_message))
+            batch_filtered.append(filtered)
+            if len(batch) < _MBOX_PARSE_BATCH:
+                continue
+            pending.append((executor.submit(_parse_mbox_batch, batch, path), batch_filtered))
+            batch = []
+            batch_filtered = []
+            # Keep every worker busy without reading the whole file ahead
+            while len(pending) > workers * 2:
+                future, counts = pending.popleft()
+                for email, count in zip(future.result(), counts):
+                    if email is not None:
+                        parsed_count += 1
+                        yield email, count
+        
+        if batch:
+            pending.append((executor.submit(_parse_mbox_batch, batch, path), batch_filtered))
+        while pending:
+            future, counts = pending.popleft()
+            for email, count in zip(future.result(), counts):
+                if email is not None:
+                    parsed_count += 1
+                    yield email, count
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
     
-    print(f"Successfully parsed {len(emails)} emails from MBOX")
-    return emails
+    print(f"Successfully parsed {parsed_count} emails from MBOX")
+    return filtered
+
+
+def _iter_parsed_emails(
+    files: List[Path],
+    *,
+    limit: int | None,
+    skip: int,
+    mbox_offsets: Dict[Path, MboxOffsets],
+    should_skip: Callable[[str, str], bool],
+) -> Iterator[Tuple[ParsedEmail, int]]:
+    """
+    Yield (email, filtered count) from files in order, leaving out those
+    should_skip rejects; the count is how many were rejected before that
+    email in this run. MBOX files are streamed message by message and
+    filtered on their headers before full parsing; individual email files
+    are parsed ahead on a process pool. skip applies to the first file only
+    (resuming from a checkpoint).
+    """
+    parsed_email_files = _parse_email_files_parallel(
+        [path for path in files if not _is_mbox_file(path)]
+    )
+    filtered = 0
+    try:
+        for file_idx, path in enumerate(files):
+            if _is_mbox_file(path):
+                filtered = yield from _parse_mbox_file(
+                    path,
+                    limit=limit,
+                    skip=skip if file_idx == 0 else 0,
+                    offsets=mbox_offsets.get(path),
+                    should_skip=should_skip,
+                    filtered_before=filtered,
+                )
+            else:
+                email = next(parsed_email_files)
+                if should_skip(email.from_address, email.subject):
+                    filtered += 1
+                else:
+                    yield email, filtered
+    finally:
+        parsed_email_files.close()
 
 
 def ingest_emails(*, rebuild: bool = False, resume: bool = False, limit: int | None = None, settings: Settings | None = None) -> IngestionStats:
@@ -342,6 +760,7 @@ def ingest_emails(*, rebuild: bool = False, resume: bool = False, limit: int | N
 
     # Checkpoint file location
     checkpoint_path = settings.data_dir / ".ingestion_checkpoint.json"
+    embedding_cache_path = settings.data_dir / ".embedding_cache.npz"
     
     # Load checkpoint if resuming
     checkpoint: Optional[IngestionCheckpoint] = None
@@ -358,137 +777,232 @@ def ingest_emails(*, rebuild: bool = False, resume: bool = False, limit: int | N
             print("No checkpoint found, starting from beginning")
 
     # Load email filters
-    filters = _load_email_filters(settings)
-    if filters:
+    compiled_filters = _load_email_filters(settings)
+    if compiled_filters:
         print("Email filtering enabled")
     else:
         print("Email filtering disabled")
 
     # Find files to process
-    all_files = sorted(settings.raw_dir.glob("**/*"))
+    all_files = _walk_files(settings.raw_dir)
     
     # Build thread counts if conversations_only mode is enabled
     thread_counts: Optional[dict] = None
-    conversations_only = filters.get('conversations_only', False) if filters else False
+    mbox_offsets: Dict[Path, MboxOffsets] = {}
+    conversations_only = compiled_filters.conversations_only if compiled_filters else False
     
     if conversations_only:
         print("\n🔍 Conversations-only mode ENABLED")
         print("   Only emails that are part of multi-email threads will be indexed")
-        thread_counts = _build_thread_counts(all_files)
+        thread_counts, mbox_offsets = _build_thread_counts(all_files)
     else:
         print("\n🔍 Conversations-only mode DISABLED")
         print("   All non-spam emails will be indexed (including single emails)")
 
-    parser_summary: List[ParsedEmail] = []
     filtered_count = checkpoint.total_emails_filtered if checkpoint else 0
     skip_count = checkpoint.emails_processed_in_file if checkpoint else 0
+    resumed = checkpoint is not None
+    resumed_filtered = filtered_count
+    resumed_indexed = checkpoint.total_emails_indexed if checkpoint else 0
     
     # Keep track of cumulative stats
     total_indexed = checkpoint.total_emails_indexed if checkpoint else 0
     total_chunks = checkpoint.total_chunks_created if checkpoint else 0
-    start_processing = not resume  # If not resuming, start immediately
-    
-    for path in all_files:
-        if path.is_file():
-            # If resuming, skip until we find the checkpoint file
-            if resume and checkpoint and not start_processing:
-                if str(path) != checkpoint.current_file:
-                    continue
-                else:
-                    start_processing = True
-                    print(f"\n🔄 Resuming file: {path.name}")
-            
-            # Handle MBOX files
-            if path.suffix == ".mbox" or "mbox" in path.name.lower():
-                parsed_emails = _parse_mbox_file(path, limit=limit, skip=skip_count if start_processing and checkpoint else 0)
-                
-                # Reset skip count after first file
-                skip_count = 0
-                
-                # Apply filtering to MBOX emails
-                if filters:
-                    for email in parsed_emails:
-                        if _should_filter_email(email.from_address, email.subject, filters, thread_counts):
-                            filtered_count += 1
-                        else:
-                            parser_summary.append(email)
-                            if limit and len(parser_summary) >= limit:
-                                break
-                else:
-                    parser_summary.extend(parsed_emails)
-                    
-                if limit and len(parser_summary) >= limit:
-                    break
-            else:
-                # Handle individual email files
-                email = parse_email_file(path)
-                
-                # Apply filtering to individual emails
-                if filters and _should_filter_email(email.from_address, email.subject, filters, thread_counts):
-                    filtered_count += 1
-                else:
-                    parser_summary.append(email)
-                    
-                if limit and len(parser_summary) >= limit:
-                    break
-
-    print(f"\nFiltering summary:")
-    print(f"  Kept:     {len(parser_summary):5d} emails")
-    print(f"  Filtered: {filtered_count - (checkpoint.total_emails_filtered if checkpoint else 0):5d} emails (this session)")
-    if checkpoint:
-        print(f"  Previously filtered: {checkpoint.total_emails_filtered:5d} emails")
-        print(f"  Total filtered: {filtered_count:5d} emails")
-    print(f"  Total:    {len(parser_summary) + filtered_count - (checkpoint.total_emails_indexed if checkpoint else 0):5d} emails processed (this session)")
-    if len(parser_summary) + filtered_count > 0:
-        session_total = len(parser_summary) + filtered_count - (checkpoint.total_emails_indexed if checkpoint else 0) - (checkpoint.total_emails_filtered if checkpoint else 0)
-        if session_total > 0:
-            print(f"  Filter rate: {(filtered_count - (checkpoint.total_emails_filtered if checkpoint else 0))/session_total*100:.1f}%")
+    files_to_process = list(all_files)
+    if resume and checkpoint:
+        # Skip files that were fully ingested before the checkpoint
+        try:
+            resume_idx = files_to_process.index(Path(checkpoint.current_file))
+        except ValueError:
+            resume_idx = len(files_to_process)
+        files_to_process = files_to_process[resume_idx:]
+        if files_to_process:
+            print(f"\n🔄 Resuming file: {files_to_process[0].name}")
 
     embedder = Embedder(settings)
+    embedding_cache = ChunkEmbeddingCache.load(
+        embedding_cache_path, settings.embedding_model, settings.embedding_cache_size
+    )
     index = EmailIndex(settings)
     if rebuild:
         index.reset()
 
-    print(f"\nEmbedding and indexing {len(parser_summary)} emails...")
+    print(f"\nEmbedding and indexing emails as they are parsed...")
     print("(Batching chunks to optimize API calls)")
     
+    # Parsing and filtering run on a background thread and hand surviving
+    # emails over a bounded queue, so the embedder is busy while files are
+    # still being parsed and memory stays bounded by the queue size.
+    email_queue: queue.Queue = queue.Queue(maxsize=256)
+    stop_parsing = threading.Event()
+    parse_errors: List[BaseException] = []
+    
+    def enqueue(item: Optional[ParsedEmail]) -> bool:
+        while not stop_parsing.is_set():
+            try:
+                email_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def should_skip(from_address: str, subject: str) -> bool:
+        nonlocal filtered_count  # Only written by the parser thread; runs ahead of embedding
+        if _should_filter_email(from_address, subject, compiled_filters, thread_counts):
+            filtered_count += 1
+            return True
+        return False
+    
+    def parse_and_filter() -> None:
+        emails = _iter_parsed_emails(
+            files_to_process,
+            limit=limit,
+            skip=skip_count,
+            mbox_offsets=mbox_offsets,
+            should_skip=should_skip,
+        )
+        kept = 0
+        try:
+            for item in emails:
+                if not enqueue(item):
+                    break
+                kept += 1
+                if limit and kept >= limit:
+                    break
+        except BaseException as e:
+            parse_errors.append(e)
+        finally:
+            emails.close()
+            enqueue(None)  # End of stream
+    
     batch_documents: List[str] = []
     batch_metadatas: List[dict] = []
     batch_ids: List[str] = []
-    batch_size_limit = 100  # Process 100 chunks at a time
+    batch_size_limit = settings.ingest_batch_chunks
+    chunk_size = settings.chunk_size_tokens
+    chunk_overlap = settings.chunk_overlap_tokens
     
     # BM25 corpus: collect all chunks and metadata for BM25 indexing
     bm25_corpus: List[str] = []  # All chunk texts
     bm25_chunk_ids: List[str] = []  # Corresponding chunk IDs
-    bm25_metadatas: List[dict] = []  # Corresponding metadata
     
     emails_processed = 0
+    emails_kept = 0
+    kept_filtered = resumed_filtered  # Emails filtered before the latest kept one
     current_file_path = str(all_files[0]) if all_files else ""
+    spooler = JsonSpooler(settings.processed_dir)
     
+    # Embedding requests run on worker threads while this loop keeps chunking.
+    # Batches land in submission order; a checkpoint is only written once a
+    # batch is in the index, so it never claims emails still in flight.
+    max_inflight = settings.ingest_max_inflight_batches
+    executor = ThreadPoolExecutor(max_workers=max_inflight, thread_name_prefix="ingest-embed")
+    in_flight: deque[Tuple[Future, List[str], List[dict], List[str], int, str, int, int]] = deque(maxlen=max_inflight)
+    
+    def submit_batch() -> None:
+        nonlocal batch_documents, batch_metadatas, batch_ids
+        print(f"  Processing email {emails_kept}: embedding {len(batch_documents)} chunks (total: {total_chunks} chunks)")
+        
+        if len(in_flight) == max_inflight:
+            land_oldest_batch()
+        in_flight.append((
+            executor.submit(embedding_cache.embed, embedder, batch_documents),
+            batch_documents,
+            batch_metadatas,
+            batch_ids,
+            emails_kept,
+            current_file_path,
+            total_chunks,
+            kept_filtered,
+        ))
+        
+        # Start a fresh batch
+        batch_documents = []
+        batch_metadatas = []
+        batch_ids = []
+    
+    # Checkpoints are kept in memory per batch but only written every few
+    # batches or seconds; a crash replays at most that window on resume
+    batches_since_save = 0
+    last_save_time = time.monotonic()
+    print(f"(Checkpointing every {settings.checkpoint_every_batches} batches or {settings.checkpoint_every_seconds:.0f}s)")
+    
+    def land_oldest_batch() -> None:
+        nonlocal emails_processed, total_indexed, checkpoint, batches_since_save, last_save_time
+        (future, documents, metadatas, ids, batch_email_idx,
+         batch_file_path, batch_total_chunks, batch_filtered) = in_flight.popleft()
+        index.add_chunks(
+            documents=documents,
+            embeddings=future.result(),
+            metadatas=metadatas,
+            ids=ids
+        )
+        
+        # Update counters
+        emails_processed = batch_email_idx
+        total_indexed += 1
+        
+        checkpoint = IngestionCheckpoint(
+            current_file=batch_file_path,
+            emails_processed_in_file=emails_processed,
+            total_emails_indexed=total_indexed,
+            total_chunks_created=batch_total_chunks,
+            total_emails_filtered=batch_filtered,
+            timestamp=datetime.utcnow().isoformat() + "Z",
+        )
+        batches_since_save += 1
+        if (
+            batches_since_save >= settings.checkpoint_every_batches
+            or time.monotonic() - last_save_time >= settings.checkpoint_every_seconds
+        ):
+            # The embedding cache is only saved at the end of the run (or on
+            # InsufficientFunds): rewriting it here would stall the loop on
+            # hundreds of MB of I/O at every checkpoint
+            spooler.flush()
+            checkpoint.save(checkpoint_path)
+            batches_since_save = 0
+            last_save_time = time.monotonic()
+    
+    parser = threading.Thread(target=parse_and_filter, name="ingest-parse", daemon=True)
+    parser.start()
     try:
-        for email_idx, email in enumerate(parser_summary, 1):
+        while True:
+            item = email_queue.get()
+            if item is None:
+                break
+            # The parser's filtered_count runs ahead; checkpoints use the
+            # count that travelled with this email
+            email, filtered_in_run = item
+            kept_filtered = resumed_filtered + filtered_in_run
+            emails_kept += 1
             current_file_path = str(email.raw_path)
-            _persist_email_json(email, settings.processed_dir)
+            spooler.submit(email)
             chunks = make_chunks(
                 email.body_text,
-                chunk_size=settings.chunk_size_tokens * 4,
-                chunk_overlap=settings.chunk_overlap_tokens * 4,
+                chunk_size=chunk_size,
+                chunk_overlap=chunk_overlap,
             )
             if not chunks:
                 continue
             
+            # Per-email fields are read once; each chunk copies them
+            message_id = email.message_id
+            id_prefix = f"{message_id}-"
+            email_metadata = {
+                "message_id": message_id,
+                "thread_id": email.thread_id,
+                "subject": email.subject,
+                "from_address": email.from_address,
+                "to": ", ".join(email.to),
+                "date": email.date,
+                "raw_path": str(email.raw_path),
+            }
             for idx, chunk in enumerate(chunks):
-                chunk_id = f"{email.message_id}-{idx:04d}"
+                chunk_id = f"{id_prefix}{idx:04d}"
                 metadata = {
-                    "message_id": email.message_id,
-                    "thread_id": email.thread_id,
-                    "subject": email.subject,
-                    "from_address": email.from_address,
-                    "to": ", ".join(email.to),
-                    "date": email.date,
+                    **email_metadata,
                     "chunk_index": idx,
-                    "raw_path": str(email.raw_path),
-                    "token_estimate": len(chunk.split()),
+                    "token_estimate": chunk.count(" ") + 1,  # Loose word count without building a token list
                 }
                 
                 # Add to ChromaDB batch
@@ -499,55 +1013,38 @@ def ingest_emails(*, rebuild: bool = False, resume: bool = False, limit: int | N
                 # Add to BM25 corpus
                 bm25_corpus.append(chunk)
                 bm25_chunk_ids.append(chunk_id)
-                bm25_metadatas.append(metadata)
             
             total_chunks += len(chunks)
             
-            # Process batch when it reaches size limit or at the end
-            should_process_batch = (
-                len(batch_documents) >= batch_size_limit or 
-                email_idx == len(parser_summary)
-            )
-            
-            if should_process_batch and batch_documents:
-                print(f"  Processing email {email_idx}/{len(parser_summary)}: embedding {len(batch_documents)} chunks (total: {total_chunks} chunks)")
-                
-                embeddings = embedder.embed(batch_documents)
-                index.add_chunks(
-                    documents=batch_documents, 
-                    embeddings=embeddings, 
-                    metadatas=batch_metadatas, 
-                    ids=batch_ids
-                )
-                
-                # Clear batch
-                batch_documents = []
-                batch_metadatas = []
-                batch_ids = []
-                
-                # Update counters
-                emails_processed = email_idx
-                total_indexed += 1
-                
-                # Save checkpoint after each successful batch
-                checkpoint = IngestionCheckpoint(
-                    current_file=current_file_path,
-                    emails_processed_in_file=emails_processed,
-                    total_emails_indexed=total_indexed,
-                    total_chunks_created=total_chunks,
-                    total_emails_filtered=filtered_count,
-                    timestamp=datetime.utcnow().isoformat() + "Z",
-                )
-                checkpoint.save(checkpoint_path)
+            # Process batch when it reaches size limit
+            if len(batch_documents) >= batch_size_limit:
+                submit_batch()
+        
+        parser.join()
+        if parse_errors:
+            raise parse_errors[0]
+        if batch_documents:
+            submit_batch()
+        while in_flight:
+            land_oldest_batch()
     
     except InsufficientFundsError as e:
-        # Save checkpoint before exiting
+        # Save checkpoint before exiting; batches still in flight are dropped
+        # and will be re-embedded on resume
+        stop_parsing.set()
+        for pending in in_flight:
+            pending[0].cancel()
+        executor.shutdown(wait=True)
+        parser.join()
+        spooler.flush()
+        embedding_cache.save(embedding_cache_path)
+        total_chunks = checkpoint.total_chunks_created if checkpoint else total_chunks
         checkpoint = IngestionCheckpoint(
-            current_file=current_file_path,
+            current_file=checkpoint.current_file if checkpoint else current_file_path,
             emails_processed_in_file=emails_processed,
             total_emails_indexed=total_indexed,
             total_chunks_created=total_chunks,
-            total_emails_filtered=filtered_count,
+            total_emails_filtered=checkpoint.total_emails_filtered if checkpoint else resumed_filtered,
             timestamp=datetime.utcnow().isoformat() + "Z",
         )
         checkpoint.save(checkpoint_path)
@@ -568,30 +1065,43 @@ def ingest_emails(*, rebuild: bool = False, resume: bool = False, limit: int | N
             processed_chunks=total_chunks,
             filtered_messages=filtered_count
         )
+    finally:
+        # Runs on every exit, errors included: queued email JSON is still
+        # written, and the parser, embedding workers and embedder loop stop
+        stop_parsing.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+        parser.join()
+        embedder.close()
+        spooler.close()  # Last: it re-raises any write error
     
+    embedding_cache.save(embedding_cache_path)
+
+    print(f"\nFiltering summary:")
+    print(f"  Kept:     {emails_kept:5d} emails")
+    print(f"  Filtered: {filtered_count - resumed_filtered:5d} emails (this session)")
+    if resumed:
+        print(f"  Previously filtered: {resumed_filtered:5d} emails")
+        print(f"  Total filtered: {filtered_count:5d} emails")
+    print(f"  Total:    {emails_kept + filtered_count - resumed_indexed:5d} emails processed (this session)")
+    if emails_kept + filtered_count > 0:
+        session_total = emails_kept + filtered_count - resumed_indexed - resumed_filtered
+        if session_total > 0:
+            print(f"  Filter rate: {(filtered_count - resumed_filtered)/session_total*100:.1f}%")
     print(f"\n✓ Ingestion complete!")
-    print(f"  Emails indexed:  {len(parser_summary)}")
+    print(f"  Emails indexed:  {emails_kept}")
     print(f"  Chunks created:  {total_chunks}")
     print(f"  Emails filtered: {filtered_count}")
+    print(f"  Embedding cache: {embedding_cache.hits} hits, {embedding_cache.misses} embedded")
     
     # Build and save BM25 index
     print(f"\n📚 Building BM25 index for keyword search...")
     if bm25_corpus:
-        # Tokenize corpus (simple whitespace + lowercase tokenization)
-        tokenized_corpus = [doc.lower().split() for doc in bm25_corpus]
-        bm25_index = BM25Okapi(tokenized_corpus)
-        
-        # Save BM25 index and metadata
-        bm25_data = {
-            "index": bm25_index,
-            "chunk_ids": bm25_chunk_ids,
-            "metadatas": bm25_metadatas,
-            "corpus": bm25_corpus,  # Keep original texts for retrieval
-        }
+        # Tokenize corpus (simple whitespace + lowercase tokenization), one
+        # chunk at a time so the token lists never all live at once
+        bm25_index = CompactBM25.from_corpus(bm25_tokenize(doc) for doc in bm25_corpus)
         
-        bm25_path = settings.index_dir / "bm25_index.pkl"
-        with open(bm25_path, "wb") as f:
-            pickle.dump(bm25_data, f)
+        # Save BM25 arrays and chunk IDs (memory-mapped by the retriever)
+        bm25_index.save(settings.index_dir / "bm25", bm25_chunk_ids)
         print(f"  ✓ BM25 index saved: {len(bm25_corpus)} chunks")
     else:
         print(f"  ⚠ No chunks to index for BM25")
@@ -602,7 +1112,7 @@ def ingest_emails(*, rebuild: bool = False, resume: bool = False, limit: int | N
         print(f"  Checkpoint cleared")
     
     return IngestionStats(
-        processed_messages=len(parser_summary),
+        processed_messages=emails_kept,
         processed_chunks=total_chunks,
         filtered_messages=filtered_count
     )
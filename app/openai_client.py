@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from functools import lru_cache
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+from .config import Settings
+
+
+@lru_cache(maxsize=None)
+def get_client(settings: Settings) -> OpenAI:
+    """Process-wide synchronous OpenAI client sharing one connection pool."""
+    return OpenAI(
+        api_key=settings.openai_api_key,
+        http_client=httpx.Client(
+            transport=httpx.HTTPTransport(retries=3),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+            timeout=60.0,
+        ),
+    )
+
+
+@lru_cache(maxsize=None)
+def get_async_client(settings: Settings) -> AsyncOpenAI:
+    """
+    Process-wide async OpenAI client. Its connections belong to the event
+    loop that first uses it, so only share it within the server's loop.
+    """
+    return AsyncOpenAI(
+        api_key=settings.openai_api_key,
+        http_client=httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(retries=3),
+            limits=httpx.Limits(max_connections=256, max_keepalive_connections=128),
+            timeout=60.0,
+        ),
+    )
@@ -1,18 +1,58 @@
 from __future__ import annotations
 
+import asyncio
+import heapq
 import pickle
+import queue
 import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
-from pathlib import Path
-from typing import Dict, List, Optional, Set
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
 
-from openai import OpenAI
-from rank_bm25 import BM25Okapi
-from rapidfuzz import fuzz
+import numpy as np
 
+from .bm25 import CompactBM25, tokenize as bm25_tokenize
 from .config import Settings
-from .embedding import Embedder
+from .embedding import ChunkEmbeddingCache, Embedder
 from .index import EmailIndex, IndexedChunk
+from .openai_client import get_client
+
+
+# Common stop words dropped from keyword extraction
+_STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'from', 'about', 'as', 'is', 'was', 'are', 'were',
+    'what', 'when', 'where', 'who', 'how', 'did', 'do', 'does', 'tell', 'me',
+    'my', 'your', 'our', 'their', 'have', 'has', 'had', 'be', 'been'
+})
+_WORD_RE = re.compile(r'\b\w+\b')
+_DATE_RE = re.compile(r'\b\d{4}\b|\b\d{1,2}/\d{1,2}/\d{2,4}\b|\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s+\d{1,2}')
+_YEAR_RE = re.compile(r'\b20\d{2}\b')
+# Query-type detection in search()
+_HAS_DATE_RE = re.compile(r'\b\d{4}\b|\b\d{1,2}/\d{1,2}|\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)')
+_PROPER_NOUN_RE = re.compile(r'\b[A-Z][a-z]+\b')
+
+
+_EXPAND_PROMPT_TMPL = """Given this search query{ctx_flag}, generate 3-5 related search terms including:
+- Synonyms
+- Common abbreviations
+- Alternative phrasings
+- Related terms
+- Specific names, dates, or entities mentioned in context
+
+{context}
+
+Current query: "{query}"
+
+If the query contains vague references like "that conversation", "what did we talk about", "they", etc., 
+use the conversation context to identify the specific subject, person, or topic being referenced.
+
+Return ONLY a comma-separated list of search terms, nothing else.
+Example: "password, PW, pw:, credentials, login info"
+"""
 
 
 @dataclass
@@ -21,35 +61,187 @@ class RetrievedChunk:
     score: float
 
 
+class _JoinedTexts:
+    """
+    One text field across all candidates, NUL-joined so substring checks run
+    as str.find over a single string. Hits map back to candidates by offset.
+    """
+    
+    def __init__(self, texts: List[str]) -> None:
+        self._joined = "\0".join(texts)
+        self._offsets = np.zeros(len(texts), dtype=np.int64)
+        if texts:
+            lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+            np.cumsum(lengths[:-1] + 1, out=self._offsets[1:])
+    
+    def contains_any(self, needles: Iterable[str]) -> np.ndarray:
+        """Boolean mask of texts containing at least one of the needles."""
+        mask = np.zeros(len(self._offsets), dtype=bool)
+        joined = self._joined
+        hits: List[int] = []
+        for needle in needles:
+            if not needle:
+                mask[:] = True  # Empty string is in every text
+                continue
+            pos = joined.find(needle)
+            while pos != -1:
+                hits.append(pos)
+                pos = joined.find(needle, pos + 1)
+        if hits:
+            mask[np.searchsorted(self._offsets, hits, side="right") - 1] = True
+        return mask
+
+
+class _SemanticBatcher:
+    """
+    Coalesces semantic searches from concurrent requests so their queries
+    share one embedding call and one index query. When nothing is in
+    flight a request is dispatched at once; under load, requests arriving
+    within max_wait of each other are grouped, up to max_batch queries.
+    """
+    
+    def __init__(
+        self,
+        search_many: Callable[[List[str]], List[List[IndexedChunk]]],
+        pool: ThreadPoolExecutor,
+        *,
+        max_batch: int = 32,
+        max_wait: float = 0.005,
+    ) -> None:
+        self._search_many = search_many
+        self._pool = pool
+        self._max_batch = max_batch
+        self._max_wait = max_wait
+        self._queue: queue.Queue = queue.Queue()
+        self._inflight = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="retriever-batcher", daemon=True)
+        self._thread.start()
+    
+    def submit(self, queries: List[str]) -> Future:
+        """Queue one request's queries; the future resolves to one hit list per query."""
+        future: Future = Future()
+        with self._lock:
+            # Checked under the lock so nothing is queued behind the stop sentinel
+            if self._closed:
+                future.set_exception(RuntimeError("Semantic batcher is closed"))
+            else:
+                self._queue.put((queries, future))
+        return future
+    
+    def close(self) -> None:
+        """
+        Stop the batching thread once everything queued so far is handed to
+        the pool. Call before shutting the pool down; later submits fail.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join()
+    
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            size = len(item[0])
+            with self._lock:
+                busy = self._inflight > 0
+            # Only wait for company when another batch is already running
+            deadline = time.monotonic() + (self._max_wait if busy else 0.0)
+            while size < self._max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True  # Dispatch what was gathered, then exit
+                    break
+                batch.append(item)
+                size += len(item[0])
+            with self._lock:
+                self._inflight += 1
+            try:
+                self._pool.submit(self._dispatch, batch)
+            except RuntimeError as e:  # Pool already shut down: fail the batch instead of hanging it
+                with self._lock:
+                    self._inflight -= 1
+                for _, future in batch:
+                    future.set_exception(e)
+    
+    def _dispatch(self, batch: List[Tuple[List[str], Future]]) -> None:
+        try:
+            hits = self._search_many([q for queries, _ in batch for q in queries])
+        except BaseException as e:  # Surfaced to every waiting request
+            for _, future in batch:
+                future.set_exception(e)
+        else:
+            start = 0
+            for queries, future in batch:
+                future.set_result(hits[start:start + len(queries)])
+                start += len(queries)
+        finally:
+            with self._lock:
+                self._inflight -= 1
+
+
 class Retriever:
     def __init__(self, settings: Settings) -> None:
         self._settings = settings
         self._embedder = Embedder(settings)
         self._index = EmailIndex(settings)
-        self._openai_client = OpenAI(api_key=settings.openai_api_key)
+        # Expansions depend only on the query and recent context, so repeats skip the LLM call
+        self._request_expansions = lru_cache(maxsize=1024)(self._request_expansions)
+        # Expansions repeat across follow-up questions; only new ones hit the API
+        self._query_embedding_cache = ChunkEmbeddingCache(settings.embedding_model, max_entries=1024)
+        # Semantic search (API + Chroma I/O) overlaps with CPU-bound BM25 scoring
+        self._search_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="retriever-semantic")
+        # Concurrent requests' semantic searches share embedding and index calls
+        self._semantic_batcher = _SemanticBatcher(
+            lambda queries: self._semantic_search_many(queries, settings.top_k), self._search_pool
+        )
+        # RRF weight per rank; both BM25 and semantic search return at most top_k hits
+        self._rrf_weights = [1.0 / (rank + 60) for rank in range(1, settings.top_k + 1)]
         
         # Load BM25 index for keyword search
         self._bm25_index = None
         self._bm25_chunk_ids = []
-        self._bm25_metadatas = []
-        self._bm25_corpus = []
         self._load_bm25_index()
+        # The index is fixed for the process lifetime, so repeated expansions reuse their hits
+        self._bm25_search = lru_cache(maxsize=1024)(self._bm25_search)
+
+    def close(self) -> None:
+        """Stop the semantic batcher, the search pool and the embedder's event loop."""
+        # Batcher first: it hands queued searches to the pool, which must still be running
+        self._semantic_batcher.close()
+        self._search_pool.shutdown(wait=True)
+        self._embedder.close()
 
     def _load_bm25_index(self) -> None:
         """Load BM25 index from disk. Fails gracefully if not found."""
-        bm25_path = self._settings.index_dir / "bm25_index.pkl"
-        if not bm25_path.exists():
+        bm25_dir = self._settings.index_dir / "bm25"
+        legacy_path = self._settings.index_dir / "bm25_index.pkl"
+        if not bm25_dir.exists() and not legacy_path.exists():
             print("⚠️  BM25 index not found. Run ingestion to build it. Using semantic-only search.")
             return
         
         try:
-            with open(bm25_path, "rb") as f:
-                bm25_data = pickle.load(f)
-            
-            self._bm25_index = bm25_data["index"]
-            self._bm25_chunk_ids = bm25_data["chunk_ids"]
-            self._bm25_metadatas = bm25_data["metadatas"]
-            self._bm25_corpus = bm25_data["corpus"]
+            if bm25_dir.exists():
+                # Arrays are memory-mapped, so startup skips reading the postings
+                self._bm25_index, self._bm25_chunk_ids = CompactBM25.load(bm25_dir)
+            else:
+                # Pickled rank_bm25 index from older ingestions
+                with open(legacy_path, "rb") as f:
+                    bm25_data = pickle.load(f)
+                self._bm25_index = bm25_data["index"]
+                self._bm25_chunk_ids = bm25_data["chunk_ids"]
+                print("⚠️  Loaded legacy bm25_index.pkl; rebuild with scripts/build_bm25_index.py for faster startup.")
             print(f"✓ Loaded BM25 index: {len(self._bm25_chunk_ids)} chunks")
         except Exception as e:
             print(f"⚠️  Failed to load BM25 index: {e}. Using semantic-only search.")
@@ -59,26 +251,20 @@ class Retriever:
         Extract important keywords from query for metadata matching.
         Returns normalized keywords (lowercase, stripped).
         """
-        # Remove common stop words
-        stop_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-            'of', 'with', 'by', 'from', 'about', 'as', 'is', 'was', 'are', 'were',
-            'what', 'when', 'where', 'who', 'how', 'did', 'do', 'does', 'tell', 'me',
-            'my', 'your', 'our', 'their', 'have', 'has', 'had', 'be', 'been'
-        }
+        query_lower = query.lower()
         
         # Split and clean
-        words = re.findall(r'\b\w+\b', query.lower())
+        words = _WORD_RE.findall(query_lower)
         
         # Keep meaningful words (3+ chars, not stop words)
-        keywords = {w for w in words if len(w) >= 3 and w not in stop_words}
+        keywords = {w for w in words if len(w) >= 3 and w not in _STOP_WORDS}
         
         # Also extract potential dates (various formats)
-        dates = re.findall(r'\b\d{4}\b|\b\d{1,2}/\d{1,2}/\d{2,4}\b|\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s+\d{1,2}', query.lower())
+        dates = _DATE_RE.findall(query_lower)
         keywords.update(dates)
         
         # Extract years
-        years = re.findall(r'\b20\d{2}\b', query)
+        years = _YEAR_RE.findall(query)
         keywords.update(years)
         
         return keywords
@@ -99,210 +285,275 @@ class Retriever:
                 role = "User" if msg["role"] == "user" else "Assistant"
                 context += f"{role}: {msg['content'][:200]}...\n"
         
-        prompt = f"""Given this search query{' and conversation context' if context else ''}, generate 3-5 related search terms including:
-- Synonyms
-- Common abbreviations
-- Alternative phrasings
-- Related terms
-- Specific names, dates, or entities mentioned in context
+        try:
+            return list(self._request_expansions(query, context))
+        except Exception as e:
+            # Failures raise out of the cached call, so they are never cached
+            print(f"Query expansion failed: {e}, using original query")
+            return [query]
 
-{context}
+    def _request_expansions(self, query: str, context: str) -> Tuple[str, ...]:
+        """Ask the LLM for expansions. Wrapped in an LRU cache per Retriever."""
+        prompt = _EXPAND_PROMPT_TMPL.format(
+            ctx_flag=" and conversation context" if context else "",
+            context=context,
+            query=query,
+        )
+        
+        # Fetched on first use: queries that skip expansion never build the client
+        response = get_client(self._settings).chat.completions.create(
+            model="gpt-4o-mini",  # Cheaper model for simple task
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.3,
+            max_tokens=100,
+        )
+        
+        expansions_text = response.choices[0].message.content.strip()
+        # Parse comma-separated list
+        expansions = [term.strip() for term in expansions_text.split(',') if term.strip()]
+        
+        # Always include original query first
+        if query not in expansions:
+            expansions.insert(0, query)
+        
+        return tuple(expansions[:5])  # Limit to 5 total
 
-Current query: "{query}"
+    def embed_query(self, query: str) -> np.ndarray:
+        """Embed one query through the query embedding cache, so a following search reuses it."""
+        return self._query_embedding_cache.embed(self._embedder, [query])[0]
 
-If the query contains vague references like "that conversation", "what did we talk about", "they", etc., 
-use the conversation context to identify the specific subject, person, or topic being referenced.
+    def _semantic_search_many(self, queries: List[str], top_k: int) -> List[List[IndexedChunk]]:
+        """
+        Embed all uncached queries in one API call and run their
+        nearest-neighbour searches in one index call. Returns one hit list
+        per query.
+        """
+        query_embeddings = self._query_embedding_cache.embed(self._embedder, queries)
+        if not len(query_embeddings):
+            return [[] for _ in queries]
+        return self._index.query_many(
+            query_embeddings=query_embeddings,
+            n_results=top_k,
+            where=None,
+        )
 
-Return ONLY a comma-separated list of search terms, nothing else.
-Example: "password, PW, pw:, credentials, login info"
-"""
+    def _bm25_search(self, query: str, top_k: int) -> Tuple[str, ...]:
+        """Return the top_k BM25 chunk IDs for query, best first. Wrapped in an LRU cache per Retriever."""
+        if self._bm25_index is None:
+            return ()
+        # Tokenize query (same tokenizer as the corpus)
+        tokenized_query = bm25_tokenize(query)
+        bm25_raw_scores = np.asarray(self._bm25_index.get_scores(tokenized_query))
         
-        try:
-            response = self._openai_client.chat.completions.create(
-                model="gpt-4o-mini",  # Cheaper model for simple task
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3,
-                max_tokens=100,
-            )
-            
-            expansions_text = response.choices[0].message.content.strip()
-            # Parse comma-separated list
-            expansions = [term.strip() for term in expansions_text.split(',') if term.strip()]
-            
-            # Always include original query first
-            if query not in expansions:
-                expansions.insert(0, query)
-            
-            return expansions[:5]  # Limit to 5 total
-            
-        except Exception as e:
-            print(f"Query expansion failed: {e}, using original query")
-            return [query]
+        # Get top BM25 results: partition around the top_k-th score in O(N),
+        # then sort just those. Ties at the cutoff are taken in corpus order,
+        # as a stable full sort would.
+        if len(bm25_raw_scores) > top_k:
+            kth = len(bm25_raw_scores) - top_k
+            threshold = np.partition(bm25_raw_scores, kth)[kth]
+            above = np.flatnonzero(bm25_raw_scores > threshold)
+            ties = np.flatnonzero(bm25_raw_scores == threshold)[:top_k - len(above)]
+            bm25_top_indices = np.concatenate([above, ties])
+        else:
+            bm25_top_indices = np.arange(len(bm25_raw_scores))
+        bm25_top_indices = bm25_top_indices[np.argsort(-bm25_raw_scores[bm25_top_indices], kind="stable")]
+        chunk_ids = self._bm25_chunk_ids
+        return tuple(chunk_ids[idx] for idx in bm25_top_indices)
 
-    def _hybrid_search(self, query: str, top_k: int = 100) -> Dict[str, float]:
+    def _hybrid_search(self, bm25_hits: Iterable[str], semantic_hits: List[IndexedChunk]) -> Dict[str, float]:
         """
-        Perform hybrid search combining BM25 (keyword) and semantic search.
+        Combine one query's BM25 (keyword) and semantic results.
+        bm25_hits are chunk IDs and semantic_hits are nearest neighbours, both in rank order.
         Returns dict mapping chunk_id to combined score using reciprocal rank fusion.
         """
-        # 1. BM25 keyword search
-        bm25_scores = {}
-        if self._bm25_index is not None:
-            # Tokenize query (same way as corpus)
-            tokenized_query = query.lower().split()
-            bm25_raw_scores = self._bm25_index.get_scores(tokenized_query)
-            
-            # Get top BM25 results
-            bm25_top_indices = sorted(range(len(bm25_raw_scores)), key=lambda i: bm25_raw_scores[i], reverse=True)[:top_k]
-            for rank, idx in enumerate(bm25_top_indices, 1):
-                chunk_id = self._bm25_chunk_ids[idx]
-                # Reciprocal rank fusion: 1 / (rank + 60)
-                bm25_scores[chunk_id] = 1.0 / (rank + 60)
-        
-        # 2. Semantic search
-        semantic_scores = {}
-        query_embedding = self._embedder.embed([query])
-        if query_embedding:
-            raw_hits = self._index.query(
-                query_embedding=query_embedding[0],
-                n_results=top_k,
-                where=None,
-            )
-            
-            for rank, chunk in enumerate(raw_hits, 1):
-                chunk_id = chunk.chunk_id
-                # Reciprocal rank fusion: 1 / (rank + 60)
-                semantic_scores[chunk_id] = 1.0 / (rank + 60)
+        # Reciprocal rank fusion: 1 / (rank + 60), equal weight to both methods.
+        # BM25 scores seed the dict and semantic scores add on in one pass.
+        weights = self._rrf_weights
+        combined_scores = dict(zip(bm25_hits, weights))
+        get = combined_scores.get
+        for chunk, weight in zip(semantic_hits, weights):
+            chunk_id = chunk.chunk_id
+            combined_scores[chunk_id] = get(chunk_id, 0.0) + weight
         
-        # 3. Combine using reciprocal rank fusion
-        combined_scores = {}
-        all_chunk_ids = set(bm25_scores.keys()) | set(semantic_scores.keys())
-        
-        for chunk_id in all_chunk_ids:
-            bm25_score = bm25_scores.get(chunk_id, 0.0)
-            semantic_score = semantic_scores.get(chunk_id, 0.0)
-            # Equal weight to both methods
-            combined_scores[chunk_id] = bm25_score + semantic_score
-        
-        print(f"🔍 Hybrid search: {len(bm25_scores)} BM25 + {len(semantic_scores)} semantic = {len(combined_scores)} combined")
+        print(f"🔍 Hybrid search: {len(bm25_hits)} BM25 + {len(semantic_hits)} semantic = {len(combined_scores)} combined")
         
         return combined_scores
 
-    def search(self, query: str, *, where: Optional[dict] = None, conversation_history: Optional[List[Dict[str, str]]] = None) -> List[RetrievedChunk]:
+    def _analyze_query(self, query: str) -> Tuple[Set[str], bool]:
+        """Return the query's keywords and whether it names specific entities."""
         # Extract keywords from query for metadata matching
         query_keywords = self._extract_keywords(query)
         
         # Detect if query has specific entities (dates, years, or proper nouns with caps)
-        has_date = bool(re.search(r'\b\d{4}\b|\b\d{1,2}/\d{1,2}|\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)', query.lower()))
-        has_proper_noun = bool(re.search(r'\b[A-Z][a-z]+\b', query))
-        is_specific_query = has_date or has_proper_noun
+        has_date = bool(_HAS_DATE_RE.search(query.lower()))
+        has_proper_noun = bool(_PROPER_NOUN_RE.search(query))
+        return query_keywords, has_date or has_proper_noun
+
+    def _should_expand(self, query: str, is_specific_query: bool, conversation_history: Optional[List[Dict[str, str]]]) -> bool:
+        """
+        Short queries that already name a date or person gain little from
+        expansion, so they skip the LLM round-trip unless there is
+        conversation context to resolve references against.
+        """
+        has_context = bool(conversation_history) and len(conversation_history) >= 2
+        return not (is_specific_query and not has_context and len(query.split()) <= self._settings.expansion_skip_max_words)
+
+    def search(self, query: str, *, where: Optional[dict] = None, conversation_history: Optional[List[Dict[str, str]]] = None) -> List[RetrievedChunk]:
+        query_keywords, is_specific_query = self._analyze_query(query)
         
         # Expand query to catch variations
-        query_expansions = self._expand_query(query, conversation_history=conversation_history)
+        if self._should_expand(query, is_specific_query, conversation_history):
+            query_expansions = self._expand_query(query, conversation_history=conversation_history)
+        else:
+            query_expansions = [query]
+        print(f"🔍 Query expansions: {query_expansions}")
+        print(f"🔑 Extracted keywords: {query_keywords}")
+        print(f"📍 Query type: {'SPECIFIC' if is_specific_query else 'CONCEPTUAL'}")
+        
+        best_rrf = self._candidate_scores(query_expansions)
+        return self._rerank(query, query_keywords, best_rrf)
+
+    async def asearch(self, query: str, *, where: Optional[dict] = None, conversation_history: Optional[List[Dict[str, str]]] = None) -> List[RetrievedChunk]:
+        """
+        Async search() for the server, run off the event loop. The plain
+        query's hybrid search runs while the LLM expands it, so only the new
+        expansions are searched once the expansion call returns. An expansion
+        that misses expansion_timeout_seconds is dropped and the plain-query
+        results are reranked on their own.
+        """
+        query_keywords, is_specific_query = self._analyze_query(query)
+        
+        if self._should_expand(query, is_specific_query, conversation_history):
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self._settings.expansion_timeout_seconds
+            expand_task = asyncio.ensure_future(asyncio.to_thread(self._expand_query, query, conversation_history))
+            best_rrf = await asyncio.to_thread(self._candidate_scores, [query])
+            try:
+                # Shielded: a late expansion still finishes in the background and
+                # lands in the expansion cache for the next follow-up
+                query_expansions = await asyncio.wait_for(
+                    asyncio.shield(expand_task), timeout=max(deadline - loop.time(), 0.0)
+                )
+            except asyncio.TimeoutError:
+                print("⏱️  Query expansion timed out, using plain-query results")
+                query_expansions = [query]
+            new_expansions = [q for q in query_expansions if q != query]
+            if new_expansions:
+                extra_rrf = await asyncio.to_thread(self._candidate_scores, new_expansions)
+                for chunk_id, rrf_score in extra_rrf.items():
+                    if rrf_score > best_rrf.get(chunk_id, -1.0):
+                        best_rrf[chunk_id] = rrf_score
+        else:
+            query_expansions = [query]
+            best_rrf = await asyncio.to_thread(self._candidate_scores, query_expansions)
         print(f"🔍 Query expansions: {query_expansions}")
         print(f"🔑 Extracted keywords: {query_keywords}")
         print(f"📍 Query type: {'SPECIFIC' if is_specific_query else 'CONCEPTUAL'}")
         
+        return await asyncio.to_thread(self._rerank, query, query_keywords, best_rrf)
+
+    def _candidate_scores(self, query_expansions: List[str]) -> Dict[str, float]:
+        """Run hybrid search for each expansion; returns the best RRF score per chunk ID."""
         # Use hybrid search (BM25 + semantic) to get candidates
-        all_chunks = {}  # Use dict to deduplicate by chunk ID
+        best_rrf: Dict[str, float] = {}  # Best RRF score per chunk ID across expansions
+        
+        # Semantic hits for every expansion (batched with any concurrent
+        # requests) come back from one embed + one index call on a worker
+        # thread, while BM25 scores the expansions here
+        semantic_future = self._semantic_batcher.submit(query_expansions)
+        bm25_hits_per_query = [self._bm25_search(q, self._settings.top_k) for q in query_expansions]
+        semantic_hits_per_query = semantic_future.result()
         
         # Perform hybrid search for each query expansion
-        for expanded_query in query_expansions:
-            hybrid_scores = self._hybrid_search(expanded_query, top_k=self._settings.top_k)
+        for bm25_hits, semantic_hits in zip(bm25_hits_per_query, semantic_hits_per_query):
+            hybrid_scores = self._hybrid_search(bm25_hits, semantic_hits)
             
             # Get all chunk IDs from hybrid search (both BM25 and semantic)
-            # Sort by score and take top candidates to limit memory usage
-            sorted_chunk_ids = sorted(hybrid_scores.keys(), key=lambda cid: hybrid_scores[cid], reverse=True)
-            top_chunk_ids = sorted_chunk_ids[:200]  # Limit to top 200 per expansion to prevent OOM
-            
-            # Retrieve full chunk data for ALL hybrid search results (not just semantic)
-            # This ensures BM25-only hits aren't discarded
-            if top_chunk_ids:
-                chunks_by_id = self._index.get_chunks_by_ids(top_chunk_ids)
-                
-                # Map chunks and combine with hybrid scores
-                for chunk_id, chunk in chunks_by_id.items():
-                    rrf_score = hybrid_scores.get(chunk_id, 0.0)
-                    
-                    if chunk_id in all_chunks:
-                        # Keep best RRF score across expansions
-                        if rrf_score > all_chunks[chunk_id]['rrf_score']:
-                            all_chunks[chunk_id] = {'chunk': chunk, 'rrf_score': rrf_score}
-                        continue
-                    
-                    all_chunks[chunk_id] = {'chunk': chunk, 'rrf_score': rrf_score}
-        
-        # Now apply metadata boosting and reranking on top of RRF scores
-        scored_chunks = {}
-        for chunk_id, data in all_chunks.items():
-            chunk = data['chunk']
-            rrf_score = data['rrf_score']
-            
-            # Use RRF score as base (already combines semantic + keyword)
-            base_score = rrf_score
-            
-            # Add metadata boost on top of RRF
-            metadata_boost = 0.0
-            
-            # Boost if subject contains query keywords
-            subject_lower = chunk.subject.lower()
-            subject_matches = sum(1 for kw in query_keywords if kw in subject_lower)
-            if subject_matches > 0:
-                metadata_boost += 0.1 * (subject_matches / max(len(query_keywords), 1))
-            
-            # Boost if sender/recipient matches person names (capitalized words)
-            potential_names = [w for w in query.split() if w and w[0].isupper() and len(w) > 2]
-            from_lower = chunk.from_address.lower()
-            for name in potential_names:
-                if name.lower() in from_lower:
-                    metadata_boost += 0.15
-                    break
-            
-            # Boost if date matches query year
-            for keyword in query_keywords:
-                if keyword.isdigit() and len(keyword) == 4:  # Year
-                    if keyword in chunk.date:
-                        metadata_boost += 0.15
-                        break
-            
-            # Penalize spammy/automated emails
-            if self._is_spammy_email(chunk):
-                metadata_boost -= self._settings.spam_penalty
-            
-            # Combined score: RRF base + metadata boost/penalties
-            # RRF already balanced semantic and keyword, so just add metadata
-            combined = base_score + metadata_boost
-            
-            scored_chunks[chunk_id] = RetrievedChunk(chunk=chunk, score=combined)
+            # Take the top candidates by score to limit memory usage
+            top_chunk_ids = heapq.nlargest(200, hybrid_scores, key=hybrid_scores.get)  # Top 200 per expansion to prevent OOM
+            for chunk_id in top_chunk_ids:
+                rrf_score = hybrid_scores[chunk_id]
+                if rrf_score > best_rrf.get(chunk_id, -1.0):
+                    best_rrf[chunk_id] = rrf_score
+        return best_rrf
+
+    def _rerank(self, query: str, query_keywords: Set[str], best_rrf: Dict[str, float]) -> List[RetrievedChunk]:
+        """Fetch candidate chunks, apply metadata boosts on top of RRF, and dedup by thread."""
+        # Retrieve full chunk data for ALL hybrid search results (not just semantic)
+        # This ensures BM25-only hits aren't discarded. Expansions overlap
+        # heavily, so fetching the union once avoids re-reading the same chunks.
+        chunks_by_id = self._index.get_chunks_by_ids(list(best_rrf))
+        
+        # Query-derived inputs to the boosts are the same for every chunk
+        keyword_count = max(len(query_keywords), 1)
+        potential_names = [w.lower() for w in query.split() if w and w[0].isupper() and len(w) > 2]
+        query_years = [kw for kw in query_keywords if kw.isdigit() and len(kw) == 4]
+        
+        # Now apply metadata boosting and reranking on top of RRF scores.
+        # Scores live in one array; RetrievedChunk objects are only built for
+        # candidates the thread dedup actually walks over.
+        candidates = list(chunks_by_id.values())
+        rrf_scores = np.fromiter(
+            (best_rrf[chunk_id] for chunk_id in chunks_by_id), dtype=np.float64, count=len(candidates)
+        )
+        
+        # Boosts are computed per column: each field is joined into one string
+        # so every keyword, name, year and spam pattern is a single C-level scan
+        subjects = _JoinedTexts([chunk.subject.lower() for chunk in candidates])
+        senders = _JoinedTexts([chunk.from_address.lower() for chunk in candidates])
+        dates = _JoinedTexts([chunk.date for chunk in candidates])
+        
+        # Boost if subject contains query keywords
+        subject_matches = np.zeros(len(candidates), dtype=np.float64)
+        for kw in query_keywords:
+            subject_matches += subjects.contains_any((kw,))
+        boosts = 0.1 * (subject_matches / keyword_count)
+        
+        # Boost if sender/recipient matches person names (capitalized words)
+        boosts += np.where(senders.contains_any(potential_names), 0.15, 0.0)
         
-        # Sort by score
-        reranked = sorted(scored_chunks.values(), key=lambda item: item.score, reverse=True)
+        # Boost if date matches query year
+        boosts += np.where(dates.contains_any(query_years), 0.15, 0.0)
+        
+        # Penalize spammy/automated emails
+        boosts -= np.where(self._spam_mask(subjects, senders), self._settings.spam_penalty, 0.0)
+        
+        # Combined score: RRF base + metadata boost/penalties
+        # RRF already balanced semantic and keyword, so just add metadata
+        combined = rrf_scores + boosts
+        
+        # Sort only the top slice by score; 3x top_k leaves slack for thread
+        # dedup. Stable sort over ascending indices keeps ties in candidate order.
+        shortlist_size = min(len(candidates), self._settings.top_k * 3)
+        if shortlist_size < len(candidates):
+            shortlist = np.sort(np.argpartition(-combined, shortlist_size - 1)[:shortlist_size])
+        else:
+            shortlist = np.arange(len(candidates))
+        order = shortlist[np.argsort(-combined[shortlist], kind="stable")]
+        
+        def reranked(indices: np.ndarray) -> Iterable[RetrievedChunk]:
+            return (RetrievedChunk(chunk=candidates[i], score=float(combined[i])) for i in indices)
         
         # Deduplicate by thread_id to improve diversity
-        return self._deduplicate_by_thread(reranked, max_per_thread=1)
+        results = self._deduplicate_by_thread(reranked(order), max_per_thread=1)
+        if len(results) < self._settings.top_k_final and shortlist_size < len(candidates):
+            # Too many shortlisted chunks shared threads; fall back to the full ranking
+            results = self._deduplicate_by_thread(reranked(np.argsort(-combined, kind="stable")), max_per_thread=1)
+        return results
     
-    def _is_spammy_email(self, chunk: IndexedChunk) -> bool:
+    def _spam_mask(self, subjects: _JoinedTexts, senders: _JoinedTexts) -> np.ndarray:
         """
         Detect automated/promotional emails with low information value.
-        Patterns are configurable in settings.
+        Patterns are configurable in settings; texts must be lowercased.
         """
-        subject = chunk.subject.lower()
-        from_addr = chunk.from_address.lower()
-        
-        # Check subject patterns
-        for pattern in self._settings.spam_subject_patterns:
-            if pattern in subject:
-                return True
-        
-        # Check sender patterns
-        for pattern in self._settings.spam_sender_patterns:
-            if pattern in from_addr:
-                return True
-        
-        return False
+        return (
+            subjects.contains_any(self._settings.spam_subject_needles)
+            | senders.contains_any(self._settings.spam_sender_needles)
+        )
     
     def _deduplicate_by_thread(
         self, 
-        chunks: List[RetrievedChunk], 
+        chunks: Iterable[RetrievedChunk], 
         max_per_thread: int = 2
     ) -> List[RetrievedChunk]:
         """
@@ -310,21 +561,25 @@ Example: "password, PW, pw:, credentials, login info"
         Keeps at most max_per_thread chunks from each thread_id.
         Returns top_k_final chunks after deduplication.
         """
-        seen_threads = {}
-        deduplicated = []
+        seen_threads: Dict[str, int] = {}
+        deduplicated: List[RetrievedChunk] = []
+        # Local bindings keep attribute lookups out of the loop
+        seen_get = seen_threads.get
+        append = deduplicated.append
+        target = self._settings.top_k_final
         
         for item in chunks:
             thread_id = item.chunk.thread_id
             
             # Count how many chunks we've already taken from this thread
-            thread_count = seen_threads.get(thread_id, 0)
+            thread_count = seen_get(thread_id, 0)
             
             if thread_count < max_per_thread:
-                deduplicated.append(item)
+                append(item)
                 seen_threads[thread_id] = thread_count + 1
                 
                 # Stop once we have enough diverse chunks
-                if len(deduplicated) >= self._settings.top_k_final:
+                if len(deduplicated) >= target:
                     break
         
         return deduplicated
@@ -1,23 +1,168 @@
 from __future__ import annotations
 
-from collections import defaultdict
-from pathlib import Path
-from typing import Any, Dict, List, Optional
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, Deque, Dict, List, Optional, Tuple
 
 from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi.responses import FileResponse, HTMLResponse, ORJSONResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
+import numpy as np
+import orjson
 from pydantic import BaseModel
 from starlette.middleware.base import BaseHTTPMiddleware
 
-from .chat import ChatService
-from .config import Settings, get_settings
-from .retrieval import RetrievedChunk, Retriever
+from .chat import HISTORY_BLOCK_MESSAGES, ChatService
+from .config import get_settings
+from .retrieval import Retriever
+
+MAX_SESSIONS = 10_000  # Conversations kept in memory; the least recently used is dropped first
+SESSION_TTL_SECONDS = 3600.0  # A conversation idle this long starts over
+RESPONSE_CACHE_USER_TURNS = 2  # Previous user turns that scope a cached answer
+
+
+class _ConversationStore(OrderedDict):
+    """
+    Session histories in LRU order. Looking up a session marks it recently
+    used (creating an empty history if needed), sessions idle past
+    SESSION_TTL_SECONDS are dropped, and adding one past MAX_SESSIONS
+    evicts the least recently used.
+    """
+    
+    def __init__(self) -> None:
+        super().__init__()
+        self._last_seen: Dict[str, float] = {}
+    
+    def __getitem__(self, session_id: str) -> Deque[Dict[str, str]]:
+        now = time.monotonic()
+        self._expire_idle(now)
+        if session_id not in self:
+            # Deques trim old messages from the front without re-slicing
+            self[session_id] = deque()
+        self.move_to_end(session_id)
+        self._last_seen[session_id] = now
+        return super().__getitem__(session_id)
+    
+    def __setitem__(self, session_id: str, history: Deque[Dict[str, str]]) -> None:
+        super().__setitem__(session_id, history)
+        self.move_to_end(session_id)
+        self._last_seen[session_id] = time.monotonic()
+        if len(self) > MAX_SESSIONS:
+            oldest, _ = self.popitem(last=False)
+            self._last_seen.pop(oldest, None)
+    
+    def __delitem__(self, session_id: str) -> None:
+        super().__delitem__(session_id)
+        self._last_seen.pop(session_id, None)
+    
+    def _expire_idle(self, now: float) -> None:
+        # LRU order means idle sessions sit at the front
+        while self:
+            oldest = next(iter(self))
+            if now - self._last_seen.get(oldest, now) <= SESSION_TTL_SECONDS:
+                break
+            del self[oldest]
+
 
 # In-memory conversation storage: {session_id: [messages]}
-conversation_store: Dict[str, List[Dict[str, str]]] = defaultdict(list)
+conversation_store = _ConversationStore()
+
+
+class _ResponseCache:
+    """
+    Recent answers keyed by the question and the last two user turns, so
+    reloads and retries skip retrieval and the LLM. Only recent user turns
+    go into the key: hashing the whole history would change it every turn.
+    """
+    
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, Tuple[float, Dict[str, Any]]] = OrderedDict()
+    
+    @staticmethod
+    def key(question: str, conversation_history: List[Dict[str, str]]) -> str:
+        recent_user = [m["content"] for m in conversation_history if m["role"] == "user"][-RESPONSE_CACHE_USER_TURNS:]
+        return hashlib.sha256("\0".join([question, *recent_user]).encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, response = entry
+        if time.monotonic() - stored_at > self._ttl_seconds:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return response
+    
+    def put(self, key: str, response: Dict[str, Any]) -> None:
+        self._entries[key] = (time.monotonic(), response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+
+class _SemanticResponseCache:
+    """
+    Answers to recent standalone questions, matched by cosine similarity of
+    the question embedding so paraphrases reuse an answer. Vectors share one
+    preallocated matrix, so a lookup is a single matrix-vector product.
+    """
+    
+    def __init__(self, max_entries: int, threshold: float, ttl_seconds: float) -> None:
+        self._max_entries = max_entries
+        self._threshold = threshold
+        self._ttl_seconds = ttl_seconds
+        self._vectors: Optional[np.ndarray] = None  # Allocated on first put, once dims are known
+        self._responses: List[Optional[Dict[str, Any]]] = [None] * max_entries
+        self._stored_at = np.zeros(max_entries, dtype=np.float64)
+        self._last_used = np.zeros(max_entries, dtype=np.int64)
+        self._clock = 0
+        self._size = 0
+    
+    def get(self, vector: np.ndarray) -> Optional[Dict[str, Any]]:
+        if not self._size:
+            return None
+        similarities = self._vectors[:self._size] @ (vector / np.linalg.norm(vector))
+        expired = self._stored_at[:self._size] < time.monotonic() - self._ttl_seconds
+        similarities[expired] = -np.inf
+        best = int(np.argmax(similarities))
+        if similarities[best] < self._threshold:
+            return None
+        self._clock += 1
+        self._last_used[best] = self._clock
+        return self._responses[best]
+    
+    def put(self, vector: np.ndarray, response: Dict[str, Any]) -> None:
+        if self._vectors is None:
+            self._vectors = np.zeros((self._max_entries, len(vector)), dtype=np.float32)
+        if self._size < self._max_entries:
+            slot = self._size
+            self._size += 1
+        else:
+            # Least recently used goes; expired entries never match, so they age out
+            slot = int(np.argmin(self._last_used))
+        self._vectors[slot] = vector / np.linalg.norm(vector)
+        self._responses[slot] = response
+        self._stored_at[slot] = time.monotonic()
+        self._clock += 1
+        self._last_used[slot] = self._clock
+
+
+def _remember_exchange(session_id: str, question: str, answer: str) -> None:
+    history = conversation_store[session_id]
+    history.append({"role": "user", "content": question})
+    history.append({"role": "assistant", "content": answer})
+    if len(history) > 20:
+        # Drop whole blocks so message positions stay aligned with the chat
+        # window's block boundaries; compaction then never moves its start
+        for _ in range(HISTORY_BLOCK_MESSAGES):
+            history.popleft()
 
 
 class SecurityHeadersMiddleware(BaseHTTPMiddleware):
@@ -59,11 +204,23 @@ def create_app() -> FastAPI:
     templates = Jinja2Templates(directory=str(settings.project_root / "templates"))
     retriever = Retriever(settings)
     chat = ChatService(settings)
+    response_cache = _ResponseCache(settings.response_cache_size, settings.response_cache_ttl_seconds)
+    semantic_cache = _SemanticResponseCache(
+        settings.semantic_cache_size, settings.semantic_cache_threshold, settings.response_cache_ttl_seconds
+    )
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        yield
+        await chat.aclose()
+        await asyncio.to_thread(retriever.close)
 
     app = FastAPI(
         title="Email QA",
         docs_url=None,  # Disable docs in production for security
         redoc_url=None,  # Disable redoc in production for security
+        lifespan=lifespan,
+        default_response_class=ORJSONResponse,  # Citation lists encode with orjson, not stdlib json
     )
     
     # Add security middleware
@@ -87,6 +244,36 @@ def create_app() -> FastAPI:
         favicon_path = settings.project_root / "templates" / "favicon.svg"
         return FileResponse(favicon_path, media_type="image/svg+xml")
 
+    async def lookup_similar(
+        question: str, conversation_history: List[Dict[str, str]]
+    ) -> Tuple[Optional[np.ndarray], Optional[Dict[str, Any]]]:
+        """
+        Semantic-cache lookup for standalone questions, run before retrieval
+        so a paraphrase hit skips expansion, search and the LLM. The question
+        is embedded through the retriever's query cache, so a following search
+        reuses the vector instead of embedding it again. Returns (embedding,
+        cached response).
+        """
+        if conversation_history:
+            return None, None  # Follow-ups depend on their context, so they never match by similarity
+        question_embedding = await asyncio.to_thread(retriever.embed_query, question)
+        return question_embedding, semantic_cache.get(question_embedding)
+
+    def store_cached(cache_key: str, question_embedding: Optional[np.ndarray], response: Dict[str, Any]) -> None:
+        response_cache.put(cache_key, response)
+        if question_embedding is not None:
+            semantic_cache.put(question_embedding, response)
+
+    def replay_cached(question: str, session_id: Optional[str], cached: Dict[str, Any]) -> StreamingResponse:
+        """Stream a cached answer as the same events a live answer produces."""
+        async def cached_events():
+            yield orjson.dumps({"type": "citations", "citations": cached["citations"]}) + b"\n"
+            yield orjson.dumps({"type": "delta", "content": cached["answer"]}) + b"\n"
+            if session_id:
+                _remember_exchange(session_id, question, cached["answer"])
+        
+        return StreamingResponse(cached_events(), media_type="application/x-ndjson")
+
     def get_retriever() -> Retriever:
         return retriever
 
@@ -106,22 +293,67 @@ def create_app() -> FastAPI:
         # Get conversation history for this session
         conversation_history = []
         if payload.session_id:
-            conversation_history = conversation_store[payload.session_id]
+            # Snapshot as a list: callers slice it, and a concurrent request may append
+            conversation_history = list(conversation_store[payload.session_id])
         
-        # Pass conversation history to search for better query expansion
-        hits = retriever.search(question, conversation_history=conversation_history)
-        response = chat_service.answer(question, hits, conversation_history=conversation_history)
+        cache_key = response_cache.key(question, conversation_history)
+        response = response_cache.get(cache_key)
+        if response is None:
+            question_embedding, response = await lookup_similar(question, conversation_history)
+        if response is None:
+            # Pass conversation history to search for better query expansion
+            hits = await retriever.asearch(question, conversation_history=conversation_history)
+            response = await chat_service.answer(question, hits, conversation_history=conversation_history)
+            store_cached(cache_key, question_embedding, response)
         
         # Save this exchange to conversation history
         if payload.session_id:
-            conversation_store[payload.session_id].append({"role": "user", "content": question})
-            conversation_store[payload.session_id].append({"role": "assistant", "content": response["answer"]})
-            # Keep only last 20 messages (10 exchanges)
-            if len(conversation_store[payload.session_id]) > 20:
-                conversation_store[payload.session_id] = conversation_store[payload.session_id][-20:]
+            _remember_exchange(payload.session_id, question, response["answer"])
         
         return QueryResponse(**response)
 
+    @app.post("/api/query/stream")
+    async def run_query_stream(
+        payload: QueryPayload,
+        retriever: Retriever = Depends(get_retriever),
+        chat_service: ChatService = Depends(get_chat),
+    ) -> StreamingResponse:
+        """Same as /api/query, but streams newline-delimited JSON events as the answer is generated."""
+        question = payload.question.strip()
+        if not question:
+            raise HTTPException(status_code=400, detail="Question cannot be empty.")
+        
+        conversation_history = []
+        if payload.session_id:
+            # Snapshot as a list: callers slice it, and a concurrent request may append
+            conversation_history = list(conversation_store[payload.session_id])
+        
+        cache_key = response_cache.key(question, conversation_history)
+        cached = response_cache.get(cache_key)
+        if cached is None:
+            question_embedding, cached = await lookup_similar(question, conversation_history)
+        if cached is not None:
+            return replay_cached(question, payload.session_id, cached)
+        
+        hits = await retriever.asearch(question, conversation_history=conversation_history)
+        
+        async def events():
+            answer_parts: List[str] = []
+            citations: List[Dict[str, Any]] = []
+            async for event in chat_service.answer_stream(question, hits, conversation_history=conversation_history):
+                if event["type"] == "delta":
+                    answer_parts.append(event["content"])
+                elif event["type"] == "citations":
+                    citations = event["citations"]
+                yield orjson.dumps(event) + b"\n"
+            answer = "".join(answer_parts).strip()
+            # Only answers that streamed to completion are reused
+            store_cached(cache_key, question_embedding, {"answer": answer, "citations": citations})
+            if payload.session_id:
+                _remember_exchange(payload.session_id, question, answer)
+        
+        return StreamingResponse(events(), media_type="application/x-ndjson")
+
     @app.post("/api/clear_conversation")
     async def clear_conversation(payload: dict) -> dict:
         session_id = payload.get("session_id")
@@ -12,14 +12,32 @@ Usage:
 import argparse
 import re
 from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Optional, Tuple
 import sys
 
+import orjson
+
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.config import get_settings
 
+_EMAIL_RE = re.compile(r'[\w\.-]+@[\w\.-]+')
+
+
+def _read_sender(json_file: Path) -> Optional[Tuple[str, str]]:
+    """Return (sender email, subject) for one processed email, or None if unreadable or no address."""
+    try:
+        data = orjson.loads(json_file.read_bytes())
+        email_match = _EMAIL_RE.search(data.get("from_address", "").lower())
+        if email_match:
+            return email_match.group(0), data.get("subject", "")
+    except Exception:
+        pass
+    return None
+
 
 def analyze_kept_emails(data_dir: Path, threshold: int = 10) -> None:
     """Analyze kept emails to find potential spam patterns."""
@@ -30,8 +48,6 @@ def analyze_kept_emails(data_dir: Path, threshold: int = 10) -> None:
         print(f"Error: Processed directory not found at {processed_dir}")
         return
     
-    import json
-    
     sender_counts = Counter()
     sender_domains = Counter()
     sender_subjects = defaultdict(list)
@@ -44,24 +60,18 @@ def analyze_kept_emails(data_dir: Path, threshold: int = 10) -> None:
     json_files = list(processed_dir.glob("*.json"))
     print(f"Found {len(json_files)} processed emails")
     
-    for json_file in json_files:
-        try:
-            data = json.loads(json_file.read_text(encoding="utf-8"))
-            from_addr = data.get("from_address", "").lower()
-            subject = data.get("subject", "")
+    # Files are parsed across processes; map keeps results in file order
+    with ProcessPoolExecutor() as executor:
+        for parsed in executor.map(_read_sender, json_files, chunksize=256):
+            if parsed is None:
+                continue
+            clean_email, subject = parsed
+            sender_counts[clean_email] += 1
+            sender_subjects[clean_email].append(subject)
             
-            # Extract clean email
-            email_match = re.search(r'[\w\.-]+@[\w\.-]+', from_addr)
-            if email_match:
-                clean_email = email_match.group(0)
-                sender_counts[clean_email] += 1
-                sender_subjects[clean_email].append(subject)
-                
-                # Extract domain
-                domain = clean_email.split('@')[-1]
-                sender_domains[domain] += 1
-        except Exception as e:
-            continue
+            # Extract domain
+            domain = clean_email.split('@')[-1]
+            sender_domains[domain] += 1
     
     # Find high-frequency senders
     high_freq_senders = [(sender, count) for sender, count in sender_counts.most_common() if count >= threshold]
@@ -4,20 +4,49 @@ Build BM25 index from existing ChromaDB without re-embedding.
 This is much faster than full ingestion (minutes vs hours).
 """
 
-import pickle
 import sys
+from itertools import chain
 from pathlib import Path
+from typing import Iterator, List, Tuple
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from rank_bm25 import BM25Okapi
+from app.bm25 import CompactBM25, tokenize
 from app.config import get_settings
 from app.index import EmailIndex
 
 
+# IDs per get(ids=...) call; each ID is a bound SQL parameter, and older
+# SQLite builds reject statements with more than 999 of them
+ID_LOOKUP_BATCH_SIZE = 500
+
+
+def _iter_chunk_batches(index: EmailIndex, batch_size: int) -> Iterator[Tuple[List[str], List[str]]]:
+    """
+    Page (chunk_ids, documents) batches out of ChromaDB. The ID list is
+    fetched once and batches are looked up by ID, since offset paging
+    rescans everything before each offset.
+    """
+    chunk_ids = index._collection.get(include=[])["ids"]
+    print(f"  Found {len(chunk_ids)} chunk IDs")
+    for start in range(0, len(chunk_ids), batch_size):
+        print(f"  Batch starting at chunk {start}...")
+        batch_ids: List[str] = []
+        batch_documents: List[str] = []
+        for lookup_start in range(start, min(start + batch_size, len(chunk_ids)), ID_LOOKUP_BATCH_SIZE):
+            lookup_end = min(lookup_start + ID_LOOKUP_BATCH_SIZE, start + batch_size)
+            lookup_data = index._collection.get(
+                ids=chunk_ids[lookup_start:lookup_end],
+                include=["documents"],
+            )
+            batch_ids.extend(lookup_data["ids"])
+            batch_documents.extend(lookup_data["documents"])
+        yield batch_ids, batch_documents
+
+
 def build_bm25_from_chromadb():
-    """Build BM25 index by reading all chunks from ChromaDB in batches."""
+    """Build BM25 index by streaming chunks from ChromaDB in batches."""
     print("=" * 80)
     print("Building BM25 Index from Existing ChromaDB")
     print("=" * 80)
@@ -29,88 +58,52 @@ def build_bm25_from_chromadb():
     
     # Process in smaller batches to avoid memory exhaustion
     batch_size = 10000
-    offset = 0
-    
-    all_chunk_ids = []
-    all_documents = []
-    all_metadatas = []
+    batches = _iter_chunk_batches(index, batch_size)
     
     try:
-        while True:
-            print(f"  Batch starting at offset {offset}...")
-            
-            # Get batch from ChromaDB
-            batch_data = index._collection.get(
-                include=["documents", "metadatas"],
-                limit=batch_size,
-                offset=offset
-            )
-            
-            batch_ids = batch_data["ids"]
-            if not batch_ids:
-                break  # No more data
-            
-            all_chunk_ids.extend(batch_ids)
-            all_documents.extend(batch_data["documents"])
-            all_metadatas.extend(batch_data["metadatas"])
-            
-            print(f"    ✓ Got {len(batch_ids)} chunks (total: {len(all_chunk_ids)})")
-            
-            offset += batch_size
-            
-            # Safety limit to prevent infinite loop
-            if offset > 300000:
-                print("    ⚠️  Reached safety limit, stopping")
-                break
-        
-        print(f"\n  ✓ Total chunks collected: {len(all_chunk_ids)}")
-        
-        if not all_chunk_ids:
-            print("\n❌ No chunks found in ChromaDB. Run ingestion first.")
-            return False
-        
+        first_batch = next(batches, None)
     except Exception as e:
         print(f"\n❌ Error reading from ChromaDB: {e}")
         import traceback
         traceback.print_exc()
         return False
     
-    print("\n🔨 Building BM25 index...")
-    print("  (Tokenizing corpus in batches to save memory...)")
+    if first_batch is None:
+        print("\n❌ No chunks found in ChromaDB. Run ingestion first.")
+        return False
+    
+    all_chunk_ids: List[str] = []
     
-    # Tokenize in batches and build index incrementally
-    # Note: BM25Okapi still needs full corpus, but we tokenize in chunks
-    tokenized_corpus = []
-    for i in range(0, len(all_documents), 10000):
-        batch = all_documents[i:i+10000]
-        tokenized_batch = [doc.lower().split() for doc in batch]
-        tokenized_corpus.extend(tokenized_batch)
-        print(f"    Tokenized {min(i+10000, len(all_documents))}/{len(all_documents)} chunks")
+    def documents() -> Iterator[str]:
+        # Each batch's text is dropped once the index has consumed it, so only
+        # chunk IDs and the postings arrays stay resident
+        for batch_ids, batch_documents in chain([first_batch], batches):
+            all_chunk_ids.extend(batch_ids)
+            print(f"    ✓ Got {len(batch_ids)} chunks (total: {len(all_chunk_ids)})")
+            yield from batch_documents
     
-    print("  (Creating BM25 index...)")
-    bm25_index = BM25Okapi(tokenized_corpus)
+    print("\n🔨 Building BM25 index while reading...")
     
+    try:
+        bm25_index = CompactBM25.from_corpus(tokenize(doc) for doc in documents())
+    except Exception as e:
+        print(f"\n❌ Error reading from ChromaDB: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    
+    print(f"\n  ✓ Total chunks indexed: {len(all_chunk_ids)}")
     print("  ✓ BM25 index built")
     
     print("\n💾 Saving BM25 index...")
     
-    # Package data
-    bm25_data = {
-        "index": bm25_index,
-        "chunk_ids": all_chunk_ids,
-        "metadatas": all_metadatas,
-        "corpus": all_documents,
-    }
-    
     # Save to disk
-    bm25_path = settings.index_dir / "bm25_index.pkl"
-    bm25_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    with open(bm25_path, "wb") as f:
-        pickle.dump(bm25_data, f)
+    bm25_dir = settings.index_dir / "bm25"
+    bm25_index.save(bm25_dir, all_chunk_ids)
     
-    print(f"  ✓ Saved to: {bm25_path}")
-    print(f"  📊 Index size: {bm25_path.stat().st_size / 1024 / 1024:.1f} MB")
+    index_size = sum(path.stat().st_size for path in bm25_dir.iterdir())
+    print(f"  ✓ Saved to: {bm25_dir}")
+    print(f"  📊 Index size: {index_size / 1024 / 1024:.1f} MB")
     
     print("\n" + "=" * 80)
     print("✅ BM25 Index Built Successfully!")
@@ -5,51 +5,71 @@ Usage: python extract_chunk.py <start> <end> <output_file>
 Example: python extract_chunk.py 1000 3000 chunk_002.mbox
 """
 
+import mmap
+import re
 import sys
 from pathlib import Path
 
-def stream_mbox(path):
-    """Stream MBOX file without building full index."""
-    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-        msg_lines = []
-        for line in f:
-            if line.startswith('From '):
-                if msg_lines:
-                    yield ''.join(msg_lines)
-                    msg_lines = []
-            msg_lines.append(line)
-        if msg_lines:
-            yield ''.join(msg_lines)
+import numpy as np
+
+_FROM_LINE_RE = re.compile(rb'(?m)^From ')
+_COPY_BLOCK_BYTES = 1 << 24
+
+def load_message_offsets(path):
+    """
+    Byte offset where each message starts, plus the file size as a final
+    sentinel. Built with one scan and cached in a .offsets.npy sidecar,
+    which is rebuilt when the mbox size changes.
+    """
+    path = Path(path)
+    sidecar = path.with_name(path.name + '.offsets.npy')
+    size = path.stat().st_size
+    if sidecar.exists():
+        offsets = np.load(sidecar)
+        if len(offsets) and offsets[-1] == size:
+            return offsets
+    
+    print(f"Indexing message offsets in {path} (one-time scan)...")
+    if size == 0:
+        offsets = np.zeros(1, dtype=np.int64)
+    else:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            starts = np.fromiter((m.start() for m in _FROM_LINE_RE.finditer(mm)), dtype=np.int64)
+        if not len(starts) or starts[0] != 0:
+            starts = np.concatenate([[0], starts])  # Lines before the first From belong to message 0
+        offsets = np.append(starts, size)
+    np.save(sidecar, offsets)
+    return offsets
 
 def extract_chunk(source_path, start_idx, end_idx, output_path):
     """Extract emails from start_idx to end_idx (exclusive)."""
     print(f"Extracting emails {start_idx} to {end_idx-1} from {source_path}")
     print(f"Output: {output_path}")
     
-    extracted = 0
-    skipped = 0
+    offsets = load_message_offsets(source_path)
+    total = len(offsets) - 1
+    start_idx = min(start_idx, total)
+    end_idx = max(min(end_idx, total), start_idx)
     
-    with open(output_path, 'w', encoding='utf-8', errors='ignore') as out:
-        for idx, raw_msg in enumerate(stream_mbox(source_path)):
-            if idx < start_idx:
-                skipped += 1
-                if skipped % 100 == 0:
-                    print(f"Skipping... {skipped} emails processed", end='\r')
-                continue
-            
-            if idx >= end_idx:
+    # Seek straight to the first message and copy raw bytes: nothing before
+    # it is read, and nothing is decoded
+    remaining = int(offsets[end_idx] - offsets[start_idx])
+    last_byte = b''
+    with open(source_path, 'rb') as src, open(output_path, 'wb') as out:
+        src.seek(int(offsets[start_idx]))
+        while remaining:
+            block = src.read(min(remaining, _COPY_BLOCK_BYTES))
+            if not block:
                 break
-            
-            out.write(raw_msg)
-            if not raw_msg.endswith('\n'):
-                out.write('\n')
-            
-            extracted += 1
-            if extracted % 100 == 0:
-                print(f"Extracted: {extracted} emails (total processed: {idx+1})", end='\r')
+            out.write(block)
+            last_byte = block[-1:]
+            remaining -= len(block)
+        if last_byte and last_byte != b'\n':
+            out.write(b'\n')
     
-    print(f"\n✓ Extracted {extracted} emails to {output_path}")
-    print(f"  Total emails processed: {skipped + extracted}")
+    extracted = end_idx - start_idx
+    print(f"✓ Extracted {extracted} emails to {output_path}")
+    print(f"  Total emails in archive: {total}")
 
 if __name__ == '__main__':
     if len(sys.argv) != 4: